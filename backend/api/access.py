@@ -0,0 +1,36 @@
+"""Cached attendee checks for the session chat and resource endpoints
+
+Chat clients hit these endpoints every few seconds, so whether a user may
+access a session is cached briefly instead of re-queried per request. The
+cache is invalidated by RSVP changes and session deletion; in multi-process
+deployments without a shared CACHES backend other processes see a change
+after at most ACCESS_CACHE_TTL seconds.
+"""
+from django.core.cache import cache
+
+from .models import SessionRSVP
+
+ACCESS_CACHE_TTL = 30
+
+# Cached for users without an RSVP, so repeated denied polls stay cheap too
+NOT_ATTENDING = 0
+
+
+def access_cache_key(session_id, user_id):
+    return f'session-access:{session_id}:{user_id}'
+
+
+def get_attending_session_host(session_id, user):
+    """Return the session's host id if `user` has RSVP'd to it, else None"""
+    key = access_cache_key(session_id, user.id)
+    host_id = cache.get(key)
+    if host_id is None:
+        host_id = SessionRSVP.objects.filter(
+            session_id=session_id, user=user
+        ).values_list('session__host_id', flat=True).first() or NOT_ATTENDING
+        cache.set(key, host_id, ACCESS_CACHE_TTL)
+    return host_id or None
+
+
+def invalidate_session_access(session_id, user_ids):
+    cache.delete_many([access_cache_key(session_id, user_id) for user_id in user_ids])
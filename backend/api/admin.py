@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, StudySession, StudyGroup, SessionRSVP, GroupMembership, Badge, SessionResource
+from .models import User, StudySession, StudyGroup, SessionRSVP, GroupMembership, Badge, SessionResource, XPEvent, Task
 
 
 @admin.register(User)
@@ -32,10 +32,10 @@ class StudyGroupAdmin(admin.ModelAdmin):
 @admin.register(StudySession)
 class StudySessionAdmin(admin.ModelAdmin):
     """StudySession admin"""
-    list_display = ['title', 'course_code', 'host', 'location', 'date', 'attendees_count', 'created_at']
-    list_filter = ['created_at', 'date']
+    list_display = ['title', 'course_code', 'host', 'location', 'date', 'starts_at', 'attendees_count', 'created_at']
+    list_filter = ['created_at', 'starts_at']
     search_fields = ['title', 'course_code', 'description']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['starts_at', 'ends_at', 'created_at', 'updated_at']
     
     def attendees_count(self, obj):
         return obj.attendees.count()
@@ -73,3 +73,20 @@ class SessionResourceAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['title', 'session__title', 'added_by__username']
     readonly_fields = ['created_at']
+
+
+@admin.register(XPEvent)
+class XPEventAdmin(admin.ModelAdmin):
+    """XPEvent admin"""
+    list_display = ['user', 'amount', 'reason', 'created_at']
+    list_filter = ['reason', 'created_at']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at']
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Task admin"""
+    list_display = ['name', 'status', 'attempts', 'run_after', 'created_at']
+    list_filter = ['name', 'status']
+    readonly_fields = ['created_at']
@@ -0,0 +1,161 @@
+"""Rule-based badge awards
+
+Badge rules are declared once in BADGE_RULES, each as a threshold on a
+per-user counter. Counters are UserCounter rows, plus the pseudo-counter
+'xp', which is read from users.xp. Each stored counter tracks the current
+value of its COUNTER_QUERIES entry: views queue +1/-1 changes (via the
+count_activity task) as activity happens and is undone, e.g. joining and
+leaving a group, so repeating an action and its reverse earns nothing.
+Evaluating rules only ever reads the counters that just changed. Migration
+0019 seeds the counters from existing activity. Changes made outside the API,
+such as deletions in the Django admin, are not counted until the
+backfill_badges command recomputes every counter from COUNTER_QUERIES.
+
+Badges, once earned, are kept even if a counter later drops below the rule's
+threshold.
+"""
+from collections import Counter, namedtuple
+
+from django.apps import apps as global_apps
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Badge, GroupMembership, StudySession, UserCounter
+
+BadgeRule = namedtuple('BadgeRule', ['name', 'counter', 'threshold', 'icon', 'color', 'bg_color'])
+
+BADGE_RULES = [
+    BadgeRule('Initiator', 'sessions_hosted', 1, 'Zap', 'text-yellow-500', 'bg-yellow-500/20'),
+    BadgeRule('Study Buddy', 'group_sessions_hosted', 5, 'BookOpen', 'text-cyan-500', 'bg-cyan-500/20'),
+    BadgeRule('Knowledge Seeker', 'sessions_attended', 10, 'BookOpen', 'text-blue-500', 'bg-blue-500/20'),
+    BadgeRule('Weekend Warrior', 'weekend_sessions_attended', 5, 'Target', 'text-red-500', 'bg-red-500/20'),
+    BadgeRule('Team Player', 'groups_joined', 3, 'Users', 'text-green-500', 'bg-green-500/20'),
+    BadgeRule('Rising Star', 'xp', 1000, 'Zap', 'text-purple-500', 'bg-purple-500/20'),
+]
+
+# Django's week_day lookup numbers days from Sunday (1) to Saturday (7)
+WEEKEND_DAYS = [1, 7]
+
+# Set-based recomputation of every stored counter, as (user_id, value) rows.
+# Each takes an app registry so migrations can run them on historical models.
+COUNTER_QUERIES = {
+    'sessions_hosted': lambda apps: apps.get_model('api', 'StudySession').objects.values(user_id=F('host_id')),
+    'group_sessions_hosted': lambda apps: apps.get_model('api', 'StudySession').objects.filter(
+        group__isnull=False
+    ).values(user_id=F('host_id')),
+    'sessions_attended': lambda apps: apps.get_model('api', 'SessionRSVP').objects.filter(
+        attended=True
+    ).values('user_id'),
+    'weekend_sessions_attended': lambda apps: apps.get_model('api', 'SessionRSVP').objects.filter(
+        attended=True, session__starts_at__week_day__in=WEEKEND_DAYS
+    ).values('user_id'),
+    'groups_joined': lambda apps: apps.get_model('api', 'GroupMembership').objects.values('user_id'),
+}
+
+
+def hosting_counters(session):
+    """Counters a newly created session increments for its host"""
+    return ['sessions_hosted', 'group_sessions_hosted'] if session.group_id else ['sessions_hosted']
+
+
+def attendance_counters(session):
+    """Counters a verified attendance increments for the attendee"""
+    counters = ['sessions_attended']
+    # Local time, like the week_day lookup in COUNTER_QUERIES
+    if session.starts_at is not None and timezone.localtime(session.starts_at).isoweekday() in (6, 7):
+        counters.append('weekend_sessions_attended')
+    return counters
+
+
+def session_counters(session, attended_user_ids):
+    """{(user_id, counter): 1} for every counter `session` counts towards: its
+    host's hosting counters and each verified attendee's attendance counters"""
+    counters = {(session.host_id, counter): 1 for counter in hosting_counters(session)}
+    for user_id in attended_user_ids:
+        counters.update({(user_id, counter): 1 for counter in attendance_counters(session)})
+    return counters
+
+
+def group_counters(group):
+    """{(user_id, counter): amount} for every counter `group` counts towards:
+    its members' groups_joined and its session hosts' group_sessions_hosted"""
+    counters = Counter(
+        (user_id, 'groups_joined')
+        for user_id in GroupMembership.objects.filter(group=group).values_list('user_id', flat=True)
+    )
+    counters.update(
+        (host_id, 'group_sessions_hosted')
+        for host_id in StudySession.objects.filter(group=group).values_list('host_id', flat=True)
+    )
+    return dict(counters)
+
+
+def counter_changes(before, after):
+    """Nonzero {(user_id, counter): delta} that turn counts `before` into `after`"""
+    changes = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+    return {key: delta for key, delta in changes.items() if delta}
+
+
+def increment_counters(increments):
+    """Apply {(user_id, counter): amount} (negative amounts decrement) and
+    return the new values, keyed the same way"""
+    UserCounter.objects.bulk_create([
+        UserCounter(user_id=user_id, name=name) for user_id, name in increments
+    ], ignore_conflicts=True)
+    for amount in set(increments.values()):
+        keys = Q()
+        for (user_id, name), key_amount in increments.items():
+            if key_amount == amount:
+                keys |= Q(user_id=user_id, name=name)
+        UserCounter.objects.filter(keys).update(value=F('value') + amount)
+    keys = Q()
+    for user_id, name in increments:
+        keys |= Q(user_id=user_id, name=name)
+    return {
+        (user_id, name): value
+        for user_id, name, value in UserCounter.objects.filter(keys).values_list('user_id', 'name', 'value')
+    }
+
+
+def award_badges(values):
+    """Create every badge earned by the given {(user_id, counter): value} readings"""
+    earned = {
+        (user_id, rule.name): rule
+        for (user_id, counter), value in values.items()
+        for rule in BADGE_RULES
+        if rule.counter == counter and value >= rule.threshold
+    }
+    if not earned:
+        return []
+    existing = set(Badge.objects.filter(
+        user_id__in={user_id for user_id, _ in earned},
+        name__in={name for _, name in earned},
+    ).values_list('user_id', 'name'))
+    # Another worker may award the same badge between the read and the insert
+    return Badge.objects.bulk_create([
+        Badge(user_id=user_id, name=rule.name, icon=rule.icon, color=rule.color, bg_color=rule.bg_color)
+        for (user_id, name), rule in earned.items()
+        if (user_id, name) not in existing
+    ], ignore_conflicts=True)
+
+
+def backfill_counters(first_id, last_id, apps=global_apps):
+    """Recompute every counter of users with ids in [first_id, last_id].
+
+    Returns {(user_id, counter): value}, including 'xp'.
+    """
+    UserCounter = apps.get_model('api', 'UserCounter')
+    in_range = {'user_id__gte': first_id, 'user_id__lte': last_id}
+    values = {}
+    for name, query in COUNTER_QUERIES.items():
+        rows = query(apps).filter(**in_range).order_by().values('user_id').annotate(value=Count('*'))
+        values.update({(row['user_id'], name): row['value'] for row in rows})
+    # Counters with no matching rows left (e.g. deleted sessions) drop to zero
+    UserCounter.objects.filter(**in_range).update(value=0)
+    UserCounter.objects.bulk_create(
+        [UserCounter(user_id=user_id, name=name, value=value) for (user_id, name), value in values.items()],
+        update_conflicts=True, unique_fields=['user', 'name'], update_fields=['value'],
+    )
+    users = apps.get_model('api', 'User').objects.filter(id__gte=first_id, id__lte=last_id)
+    values.update({(user_id, 'xp'): xp for user_id, xp in users.values_list('id', 'xp')})
+    return values
@@ -0,0 +1,81 @@
+"""Per-user dashboard payload, cached between the changes that affect it
+
+The payload is cached for DASHBOARD_CACHE_TTL seconds under the user's key
+and dropped (after commit) whenever that user RSVPs, joins or leaves a group,
+hosts a session, or a session or group they belong to changes. Attendee counts
+of other people's RSVPs and sessions that end are picked up when the entry
+expires.
+
+XP is awarded by the task worker, a different process whose invalidations
+never reach this process's cache, so xp and level are left out of the cached
+entry and read live: a cache hit costs that one query.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import GroupMembership, SessionRSVP, StudySession, User
+from .serializers import DashboardSessionSerializer
+
+DASHBOARD_CACHE_TTL = 120
+
+UPCOMING_SESSION_LIMIT = 3
+
+# Stats read on every request instead of cached
+LIVE_STATS = ('xp', 'level')
+
+
+def dashboard_cache_key(user_id):
+    return f'dashboard:{user_id}'
+
+
+def count_for_user(queryset, field):
+    """Scalar subquery counting `queryset` rows whose `field` is the outer user"""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('id')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def build_dashboard(user):
+    """Dashboard payload for `user`: upcoming sessions plus activity stats, in two queries"""
+    stats = User.objects.filter(pk=user.pk).annotate(
+        sessions_attended=count_for_user(SessionRSVP.objects.all(), 'user'),
+        groups_joined=count_for_user(GroupMembership.objects.all(), 'user'),
+        sessions_hosted=count_for_user(StudySession.objects.all(), 'host'),
+    ).values('sessions_attended', 'groups_joined', 'sessions_hosted', *LIVE_STATS).get()
+
+    # Upcoming sessions user is attending, soonest first; sessions whose
+    # schedule could not be parsed are listed after dated ones
+    upcoming_sessions = StudySession.objects.filter(
+        Q(ends_at__gte=timezone.now()) | Q(starts_at__isnull=True),
+        attendees=user
+    ).select_related('host', 'group').with_attendees_count().order_by(
+        F('starts_at').asc(nulls_last=True), 'id'
+    )[:UPCOMING_SESSION_LIMIT]
+
+    return {
+        'upcoming_sessions': list(DashboardSessionSerializer(upcoming_sessions, many=True).data),
+        'stats': stats,
+    }
+
+
+def get_dashboard(user):
+    key = dashboard_cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = build_dashboard(user)
+        cached_stats = {name: value for name, value in data['stats'].items() if name not in LIVE_STATS}
+        cache.set(key, {**data, 'stats': cached_stats}, DASHBOARD_CACHE_TTL)
+        return data
+    live_stats = User.objects.filter(pk=user.pk).values(*LIVE_STATS).get()
+    return {**data, 'stats': {**data['stats'], **live_stats}}
+
+
+def invalidate_dashboards(user_ids):
+    """Drop cached dashboards once the current transaction commits"""
+    keys = [dashboard_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
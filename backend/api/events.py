@@ -0,0 +1,315 @@
+"""Publish/subscribe for live session events (chat messages, RSVPs, attendance, resources)
+
+Views publish events with publish_session_event(); the SSE endpoint in
+api.streams subscribes to them, and long-polling requests block on
+message_waiters until the broker reports a new message. The broker is chosen
+by settings.EVENT_BROKER:
+
+- InProcessBroker (default) fans events out inside one server process, which
+  is all a single ASGI worker needs.
+- LocalProcessBroker forwards events through `manage.py run_event_broker`, a
+  small local broker process, so that several workers share one event feed.
+"""
+import asyncio
+import json
+import logging
+import socket
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before the oldest are dropped and the client is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+RESYNC_EVENT = {'type': 'resync', 'data': {}}
+
+# Carries a {'session': id} notice for every session event, for listeners that
+# need activity across all sessions without one subscription per session
+ACTIVITY_CHANNEL = 'activity'
+
+
+def session_channel(session_id):
+    return f'session:{session_id}'
+
+
+def encode_event(event):
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+class QueueSubscription:
+    """An asyncio queue of events for one subscriber, fed from any thread"""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = None
+        self.queue = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.broker._add_subscriber(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove_subscriber(self)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Subscriber's event loop already closed
+            pass
+
+    def _put(self, event):
+        if self.queue.full():
+            # Slow consumer: drop the backlog and ask the client to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC_EVENT
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Delivers events to subscribers in the same process"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._listeners = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            listeners = list(self._listeners.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        for callback in listeners:
+            callback(event)
+
+    def subscribe(self, channel):
+        return QueueSubscription(self, channel)
+
+    def listen(self, channel, callback):
+        """Call `callback(event)` synchronously for every event published to `channel`"""
+        with self._lock:
+            self._listeners[channel].append(callback)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def _add_subscriber(self, subscription):
+        with self._lock:
+            self._subscribers[subscription.channel].add(subscription)
+
+    def _remove_subscriber(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+def parse_broker_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+class RemoteSubscription:
+    """Subscription held open as a connection to the local broker process"""
+
+    def __init__(self, address, channel):
+        self.address = address
+        self.channel = channel
+        self.reader = None
+        self.writer = None
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(*self.address)
+        self.writer.write((json.dumps({'op': 'subscribe', 'channel': self.channel}) + '\n').encode())
+        await self.writer.drain()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.writer.close()
+
+    async def get(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError('Event broker closed the connection')
+        return json.loads(line)
+
+
+class LocalProcessBroker:
+    """Publishes to and subscribes through the `run_event_broker` process"""
+
+    def __init__(self, address=None):
+        self.address = parse_broker_address(address or settings.EVENT_BROKER_ADDRESS)
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        line = (json.dumps({'op': 'publish', 'channel': channel, 'event': event}, cls=DjangoJSONEncoder) + '\n').encode()
+        with self._lock:
+            # One reconnect attempt covers a broker restart between publishes
+            for _ in range(2):
+                try:
+                    if self._socket is None:
+                        self._socket = socket.create_connection(self.address, timeout=2)
+                    self._socket.sendall(line)
+                    return
+                except OSError:
+                    if self._socket is not None:
+                        self._socket.close()
+                    self._socket = None
+        logger.warning('Event broker at %s:%s unavailable, dropped %s event', *self.address, event['type'])
+
+    def subscribe(self, channel):
+        return RemoteSubscription(self.address, channel)
+
+    def listen(self, channel, callback):
+        """Call `callback(event)` from a background thread for every event on `channel`"""
+        async def consume():
+            while True:
+                try:
+                    async with self.subscribe(channel) as subscription:
+                        while True:
+                            callback(await subscription.get())
+                except (OSError, ConnectionError):
+                    logger.warning('Lost event broker at %s:%s, reconnecting', *self.address)
+                    await asyncio.sleep(1)
+
+        threading.Thread(target=asyncio.run, args=(consume(),), name=f'event-listener-{channel}', daemon=True).start()
+
+
+class EventBrokerServer:
+    """Line-delimited JSON fan-out server run by `manage.py run_event_broker`"""
+
+    # Subscribers with more than this many unsent bytes are disconnected
+    MAX_WRITE_BUFFER = 1024 * 1024
+
+    def __init__(self):
+        self.channels = defaultdict(set)
+
+    async def handle(self, reader, writer):
+        subscribed = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get('op') == 'subscribe':
+                    self.channels[message['channel']].add(writer)
+                    subscribed.add(message['channel'])
+                elif message.get('op') == 'publish':
+                    self.fan_out(message['channel'], message['event'])
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels[channel].discard(writer)
+                if not self.channels[channel]:
+                    del self.channels[channel]
+            writer.close()
+
+    def fan_out(self, channel, event):
+        payload = (json.dumps(event) + '\n').encode()
+        for writer in list(self.channels.get(channel, ())):
+            if writer.transport.get_write_buffer_size() > self.MAX_WRITE_BUFFER:
+                writer.close()
+                self.channels[channel].discard(writer)
+                continue
+            writer.write(payload)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENT_BROKER)()
+    return _broker
+
+
+def publish_session_event(session_id, event_type, data):
+    """Publish an event to a session's subscribers once the current transaction commits"""
+    event = {'type': event_type, 'data': data}
+    notice = {'type': event_type, 'data': {'session': session_id}}
+
+    def publish():
+        broker = get_broker()
+        broker.publish(session_channel(session_id), event)
+        broker.publish(ACTIVITY_CHANNEL, notice)
+
+    transaction.on_commit(publish)
+
+
+class SessionWaiters:
+    """Lets request threads sleep until a session gets an event of a given type"""
+
+    def __init__(self, event_type):
+        self.event_type = event_type
+        self._waiters = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def _ensure_listening(self):
+        with self._lock:
+            if self._listening:
+                return
+            self._listening = True
+        get_broker().listen(ACTIVITY_CHANNEL, self._on_event)
+
+    def _on_event(self, event):
+        if event.get('type') != self.event_type:
+            return
+        with self._lock:
+            waiters = list(self._waiters.get(event['data']['session'], ()))
+        for waiter in waiters:
+            waiter.set()
+
+    @contextmanager
+    def watch(self, session_id):
+        """Register interest before checking the database, so an event that lands
+        between the check and the wait still wakes the caller"""
+        self._ensure_listening()
+        waiter = threading.Event()
+        with self._lock:
+            self._waiters[session_id].add(waiter)
+        try:
+            yield waiter
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(session_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[session_id]
+
+
+message_waiters = SessionWaiters('message.created')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+
+from api.badges import award_badges, backfill_counters
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = 'Recompute activity counters for all users and award every badge they have earned'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Users per chunk, by id range (default 5000)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        bounds = User.objects.aggregate(first_id=Min('id'), last_id=Max('id'))
+        if bounds['first_id'] is None:
+            self.stdout.write('No users to backfill')
+            return
+
+        first_id, last_id = bounds['first_id'], bounds['last_id']
+        chunks = (last_id - first_id) // chunk_size + 1
+        total = 0
+        for number, start in enumerate(range(first_id, last_id + 1, chunk_size), 1):
+            end = min(start + chunk_size - 1, last_id)
+            with transaction.atomic():
+                awarded = award_badges(backfill_counters(start, end))
+            total += len(awarded)
+            self.stdout.write(f'[{number}/{chunks}] ids {start}-{end}: {len(awarded)} badges awarded')
+
+        self.stdout.write(self.style.SUCCESS(f'{total} badges awarded'))
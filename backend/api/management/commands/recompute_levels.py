@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Max, Min, Q
+
+from api.models import User
+from api.utils import level_expression
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user level from XP, e.g. after retuning the XP curve'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Users per UPDATE, by id range (default 10000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count users whose level is out of date',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        bounds = User.objects.aggregate(first_id=Min('id'), last_id=Max('id'))
+        if bounds['first_id'] is None:
+            self.stdout.write('No users to update')
+            return
+
+        # Evaluated by the database, so rows never travel to Python
+        level = level_expression(F('xp'))
+        first_id, last_id = bounds['first_id'], bounds['last_id']
+        chunks = (last_id - first_id) // chunk_size + 1
+        total = 0
+        for number, start in enumerate(range(first_id, last_id + 1, chunk_size), 1):
+            # Only rows that drifted are written; each chunk commits on its own
+            stale = User.objects.filter(id__gte=start, id__lt=start + chunk_size).filter(~Q(level=level))
+            changed = stale.count() if dry_run else stale.update(level=level)
+            total += changed
+            self.stdout.write(f'[{number}/{chunks}] ids {start}-{min(start + chunk_size - 1, last_id)}: {changed} levels')
+
+        verb = 'out of date' if dry_run else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'{total} user levels {verb}'))
@@ -0,0 +1,25 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.events import EventBrokerServer, parse_broker_address
+
+
+class Command(BaseCommand):
+    help = 'Run the local event broker that fans session events out across ASGI workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address',
+            default=settings.EVENT_BROKER_ADDRESS,
+            help='host:port to listen on (defaults to EVENT_BROKER_ADDRESS)',
+        )
+
+    def handle(self, *args, **options):
+        host, port = parse_broker_address(options['address'])
+        self.stdout.write(f'Event broker listening on {host}:{port}')
+        try:
+            asyncio.run(EventBrokerServer().serve(host, port))
+        except KeyboardInterrupt:
+            self.stdout.write('Event broker stopped')
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.tasks import run_pending_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (XP awards and other request side effects)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Tasks claimed per batch (default 100)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when no tasks are due (default 1)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no tasks are due instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        self.stdout.write('Task worker started')
+        try:
+            while True:
+                claimed = run_pending_tasks(options['batch_size'])
+                if claimed:
+                    self.stdout.write(f'Ran {claimed} tasks')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('Task worker stopped')
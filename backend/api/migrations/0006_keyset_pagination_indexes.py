@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_sessionresource'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sessionmessage',
+            index=models.Index(fields=['session', 'created_at', 'id'], name='session_message_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionrsvp',
+            index=models.Index(fields=['session', 'created_at', 'id'], name='session_rsvp_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studygroup',
+            index=models.Index(fields=['-created_at', '-id'], name='study_group_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studygroup',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='study_group_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['-created_at', '-id'], name='study_session_created_idx'),
+        ),
+    ]
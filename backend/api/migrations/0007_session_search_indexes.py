@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+from api.search import group_search_vector, session_search_vector
+
+
+# The query expressions come from the same functions, since PostgreSQL only
+# uses these indexes for searches whose expressions match them exactly.
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        # SQLite gets an FTS5 table from api.search.ensure_sqlite_search_index
+        return
+    from django.contrib.postgres.indexes import GinIndex
+
+    StudySession = apps.get_model('api', 'StudySession')
+    StudyGroup = apps.get_model('api', 'StudyGroup')
+    schema_editor.add_index(StudySession, GinIndex(session_search_vector(), name='study_session_search_idx'))
+    schema_editor.add_index(StudyGroup, GinIndex(group_search_vector(), name='study_group_search_idx'))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS study_session_search_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS study_group_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
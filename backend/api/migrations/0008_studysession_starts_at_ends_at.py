@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:34
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from api.schedule import parse_session_schedule
+
+
+def parse_existing_schedules(apps, schema_editor):
+    StudySession = apps.get_model('api', 'StudySession')
+    sessions = StudySession.objects.only('id', 'date', 'time', 'created_at')
+    batch = []
+    for session in sessions.iterator(chunk_size=500):
+        reference = timezone.localdate(session.created_at) if session.created_at else None
+        session.starts_at, session.ends_at = parse_session_schedule(session.date, session.time, reference=reference)
+        if session.starts_at is not None:
+            batch.append(session)
+        if len(batch) >= 500:
+            StudySession.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+            batch = []
+    if batch:
+        StudySession.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_session_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studysession',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studysession',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(parse_existing_schedules, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['starts_at', 'id'], name='study_session_starts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['ends_at', 'starts_at'], name='study_session_ends_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['group', 'starts_at'], name='study_session_group_starts_idx'),
+        ),
+    ]
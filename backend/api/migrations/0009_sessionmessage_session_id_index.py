@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_studysession_starts_at_ends_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sessionmessage',
+            index=models.Index(fields=['session', 'id'], name='session_message_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_sessionmessage_session_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupmembership',
+            index=models.Index(fields=['group', 'joined_at', 'id'], name='group_membership_joined_idx'),
+        ),
+    ]
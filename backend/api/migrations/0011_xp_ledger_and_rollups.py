@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_group_membership_joined_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('xp', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'xp_rollups',
+                'indexes': [models.Index(fields=['period', 'period_start', '-xp', 'user'], name='xp_rollup_top_idx')],
+                'unique_together': {('user', 'period', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='XPEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'xp_events',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='xp_event_user_created_idx')],
+            },
+        ),
+    ]
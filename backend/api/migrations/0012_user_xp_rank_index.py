@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_xp_ledger_and_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-xp', 'id'], name='user_xp_rank_idx'),
+        ),
+    ]
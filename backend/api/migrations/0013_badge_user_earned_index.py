@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:47
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_user_xp_rank_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', api.models.UserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='badge',
+            index=models.Index(fields=['user', '-earned_at', '-id'], name='badge_user_earned_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:06
+
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+
+def delete_duplicate_badges(apps, schema_editor):
+    """Keep the first of each user's badges with the same name"""
+    Badge = apps.get_model('api', 'Badge')
+    earlier = Badge.objects.filter(user=OuterRef('user'), name=OuterRef('name'), id__lt=OuterRef('id'))
+    Badge.objects.filter(Exists(earlier)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_user_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_badges, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='badge',
+            unique_together={('user', 'name')},
+        ),
+    ]
@@ -0,0 +1,43 @@
+import sys
+
+from django.db import DatabaseError, migrations, transaction
+
+
+# Must match the UPPER(course_code::text) LIKE expression that
+# course_code__icontains compiles to in api.search._search_postgresql.
+def create_course_code_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.db.models import TextField
+    from django.db.models.functions import Cast, Upper
+
+    StudySession = apps.get_model('api', 'StudySession')
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            # pg_trgm is a trusted extension, so the database owner can usually create it
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.add_index(StudySession, GinIndex(
+                OpClass(Upper(Cast('course_code', TextField())), name='gin_trgm_ops'),
+                name='study_session_course_trgm_idx',
+            ))
+    except DatabaseError as exc:
+        # Course code substring search still works, just without an index
+        sys.stderr.write(f'\n  Skipped the course code trigram index: {exc}'.rstrip() + '\n')
+
+
+def drop_course_code_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS study_session_course_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_badge_unique_per_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_course_code_index, drop_course_code_index),
+    ]
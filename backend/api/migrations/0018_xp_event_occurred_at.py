@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_session_course_code_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='xpevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import Max, Min
+
+from api.badges import backfill_counters
+
+# Users per chunk, by id range, as in the backfill_badges command
+CHUNK_SIZE = 5000
+
+
+def seed_user_counters(apps, schema_editor):
+    """Count existing activity, so the first decrement after deploy does not start from zero"""
+    User = apps.get_model('api', 'User')
+    bounds = User.objects.aggregate(first_id=Min('id'), last_id=Max('id'))
+    if bounds['first_id'] is None:
+        return
+    for start in range(bounds['first_id'], bounds['last_id'] + 1, CHUNK_SIZE):
+        backfill_counters(start, min(start + CHUNK_SIZE - 1, bounds['last_id']), apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_xp_event_occurred_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_user_counters, migrations.RunPython.noop),
+    ]
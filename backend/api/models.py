@@ -1,7 +1,31 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as AuthUserManager
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .schedule import parse_session_schedule
+
+
+# Number of attendees embedded in session list rows; the full roster is paginated separately
+ATTENDEE_PREVIEW_SIZE = 5
+
+# Number of members embedded in group list rows; the full list is paginated separately
+MEMBER_PREVIEW_SIZE = 3
+
+
+class UserQuerySet(models.QuerySet):
+    """Query helpers for User"""
+
+    def with_latest_badge(self):
+        """Annotate latest_badge with the name of each user's most recently earned badge"""
+        latest = Badge.objects.filter(user=OuterRef('pk')).order_by('-earned_at', '-id').values('name')[:1]
+        return self.annotate(latest_badge=Subquery(latest))
+
+
+class UserManager(AuthUserManager.from_queryset(UserQuerySet)):
+    """Django's user manager with the UserQuerySet helpers"""
+
 
 class User(AbstractUser):
     """Extended User model with XP and level tracking"""
@@ -11,13 +35,37 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserManager()
+
     class Meta:
         db_table = 'users'
+        indexes = [
+            # All-time leaderboard order, also read to build api.ranking.RankIndex
+            models.Index(fields=['-xp', 'id'], name='user_xp_rank_idx'),
+        ]
 
     def __str__(self):
         return self.username
 
 
+class StudyGroupQuerySet(models.QuerySet):
+    """Query helpers for StudyGroup"""
+
+    def with_members_count(self):
+        """Annotate members_count"""
+        counts = GroupMembership.objects.filter(group=OuterRef('pk')).order_by().values('group').annotate(
+            total=Count('id')
+        ).values('total')
+        return self.annotate(members_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+    def with_member_summary(self, preview_size=MEMBER_PREVIEW_SIZE):
+        """Annotate members_count and prefetch the earliest memberships as member_preview"""
+        preview = GroupMembership.objects.select_related('user').order_by('joined_at', 'id')[:preview_size]
+        return self.with_members_count().prefetch_related(
+            Prefetch('groupmembership_set', queryset=preview, to_attr='member_preview')
+        )
+
+
 class StudyGroup(models.Model):
     """Study groups for collaborative learning"""
     STATUS_CHOICES = [
@@ -35,14 +83,39 @@ class StudyGroup(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudyGroupQuerySet.as_manager()
+
     class Meta:
         db_table = 'study_groups'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='study_group_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='study_group_status_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class StudySessionQuerySet(models.QuerySet):
+    """Query helpers for StudySession"""
+
+    def with_attendees_count(self):
+        """Annotate attendees_count"""
+        # Correlated subquery rather than a JOIN + GROUP BY so it composes with attendee filters
+        counts = SessionRSVP.objects.filter(session=OuterRef('pk')).order_by().values('session').annotate(
+            total=Count('id')
+        ).values('total')
+        return self.annotate(attendees_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+    def with_attendee_summary(self, preview_size=ATTENDEE_PREVIEW_SIZE):
+        """Annotate attendees_count and prefetch the first RSVPs as attendee_preview"""
+        preview = SessionRSVP.objects.select_related('user').order_by('created_at', 'id')[:preview_size]
+        return self.with_attendees_count().prefetch_related(
+            Prefetch('sessionrsvp_set', queryset=preview, to_attr='attendee_preview')
+        )
+
+
 class StudySession(models.Model):
     """Study sessions organized by users"""
     title = models.CharField(max_length=200)
@@ -50,6 +123,9 @@ class StudySession(models.Model):
     description = models.TextField()
     date = models.CharField(max_length=100)  # Store as string for flexibility
     time = models.CharField(max_length=100)  # Store as string like "8:00 AM - 10:00 AM"
+    # Parsed from date/time on save; null when the strings cannot be understood
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
     location = models.CharField(max_length=200)
     verification_code = models.CharField(max_length=6, blank=True)
     host = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hosted_sessions')
@@ -58,13 +134,30 @@ class StudySession(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudySessionQuerySet.as_manager()
+
     class Meta:
         db_table = 'study_sessions'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='study_session_created_idx'),
+            models.Index(fields=['starts_at', 'id'], name='study_session_starts_idx'),
+            models.Index(fields=['ends_at', 'starts_at'], name='study_session_ends_idx'),
+            models.Index(fields=['group', 'starts_at'], name='study_session_group_starts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.course_code} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        # Keep the structured schedule in sync with the display strings
+        reference = timezone.localdate(self.created_at) if self.created_at else None
+        self.starts_at, self.ends_at = parse_session_schedule(self.date, self.time, reference=reference)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date', 'time'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'starts_at', 'ends_at'}
+        super().save(*args, **kwargs)
+
 
 class SessionRSVP(models.Model):
     """Many-to-many relationship for session attendance"""
@@ -76,6 +169,9 @@ class SessionRSVP(models.Model):
     class Meta:
         db_table = 'session_rsvps'
         unique_together = ['user', 'session']
+        indexes = [
+            models.Index(fields=['session', 'created_at', 'id'], name='session_rsvp_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.session.title}"
@@ -90,6 +186,9 @@ class GroupMembership(models.Model):
     class Meta:
         db_table = 'group_memberships'
         unique_together = ['user', 'group']
+        indexes = [
+            models.Index(fields=['group', 'joined_at', 'id'], name='group_membership_joined_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.group.name}"
@@ -107,6 +206,11 @@ class Badge(models.Model):
     class Meta:
         db_table = 'badges'
         ordering = ['-earned_at']
+        # Concurrent task workers may evaluate the same rule at once
+        unique_together = ['user', 'name']
+        indexes = [
+            models.Index(fields=['user', '-earned_at', '-id'], name='badge_user_earned_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.name}"
@@ -122,6 +226,10 @@ class SessionMessage(models.Model):
     class Meta:
         db_table = 'session_messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['session', 'created_at', 'id'], name='session_message_created_idx'),
+            models.Index(fields=['session', 'id'], name='session_message_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username} in {self.session.title}: {self.text[:50]}"
@@ -141,3 +249,93 @@ class SessionResource(models.Model):
 
     def __str__(self):
         return f"{self.title} - {self.session.title}"
+
+
+class XPEvent(models.Model):
+    """Append-only ledger of every XP award"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='xp_events')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=50, blank=True)
+    # When the XP was earned, which may be before the task worker recorded it
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'xp_events'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='xp_event_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} +{self.amount} XP ({self.reason})"
+
+
+class XPRollup(models.Model):
+    """XP earned per user per day, week and month, kept up to date by award_xp"""
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='xp_rollups')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    # First day of the period: the day itself, the Monday of the week, or the 1st of the month
+    period_start = models.DateField()
+    xp = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'xp_rollups'
+        unique_together = ['user', 'period', 'period_start']
+        indexes = [
+            # Top-K read for one leaderboard window
+            models.Index(fields=['period', 'period_start', '-xp', 'user'], name='xp_rollup_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.period} of {self.period_start}: {self.xp} XP"
+
+
+class Task(models.Model):
+    """Queued side effect of a request, run by `manage.py run_tasks` (see api.tasks)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Claim token of the worker running the task, and when its lease expires
+    locked_by = models.CharField(max_length=32, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tasks'
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after', 'id'], name='task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class UserCounter(models.Model):
+    """Running per-user activity count that badge rules are evaluated against (see api.badges)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='counters')
+    name = models.CharField(max_length=50)
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'user_counters'
+        unique_together = ['user', 'name']
+
+    def __str__(self):
+        return f"{self.user.username} {self.name}: {self.value}"
@@ -0,0 +1,149 @@
+"""Pagination classes for API endpoints"""
+from django.db.models import Subquery
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over (created_at, id), newest first.
+
+    Pages are fetched with an indexed range scan from the cursor position,
+    so deep pages cost the same as the first one and no COUNT(*) is issued.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SessionCursorPagination(CreatedAtCursorPagination):
+    """Session listing; ?ordering=starts_at lists scheduled sessions soonest first.
+    Search results use SearchResultPagination instead."""
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get('ordering') == 'starts_at':
+            return ('starts_at', 'id')
+        return super().get_ordering(request, queryset, view)
+
+
+class SearchResultPagination(LimitOffsetPagination):
+    """Limit/offset pages over search results, best match first.
+
+    A cursor would have to be keyed on search_rank, a computed float that ties
+    and rounds, so pages could repeat or skip rows; offsets over the total
+    order (-search_rank, -id) cannot. Each page fetches one extra row to find
+    out whether there is a next page instead of counting every match.
+    """
+    ordering = ('-search_rank', '-id')
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        page = list(queryset.order_by(*self.ordering)[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        return page[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data})
+
+
+class MessageHistoryPagination(BasePagination):
+    """Chat history window: the latest `page_size` messages, newest first.
+
+    `next` pages backward with ?before_id=<oldest id on this page>. Each page is
+    a range scan on the (session, created_at, id) index however long the
+    history is, so opening a busy chat costs the same as opening a new one.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        before_id = request.query_params.get('before_id')
+        if before_id:
+            if not before_id.isdigit():
+                raise ValidationError({'before_id': 'Must be an integer id'})
+            anchor = Subquery(queryset.filter(id=int(before_id)).order_by().values('created_at')[:1])
+            queryset = queryset.filter(created_at__lte=anchor).exclude(created_at=anchor, id__gte=int(before_id))
+
+        page = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        if self.has_next:
+            last = page[-1]
+            # Pages may hold model instances or .values() rows
+            self.next_before_id = last['id'] if isinstance(last, dict) else last.id
+        else:
+            self.next_before_id = None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), 'before_id', self.next_before_id)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
+
+
+class AttendeeCursorPagination(CursorPagination):
+    """Session roster in RSVP order"""
+    ordering = ('created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class MemberCursorPagination(CursorPagination):
+    """Group members in join order"""
+    ordering = ('joined_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RankPagination(LimitOffsetPagination):
+    """Limit/offset pages over the cached rank order (api.ranking).
+
+    Offsets slice an in-memory array rather than the database, so deep pages
+    cost the same as the first one.
+    """
+    default_limit = 50
+    max_limit = 100
+    around_query_param = 'around'
+    around_position = None
+
+    def paginate_around(self, ids, position, request):
+        """Return the page of `limit` entries centred on `position`"""
+        self.around_position = position
+        return self.paginate_queryset(ids, request)
+
+    def get_offset(self, request):
+        if self.around_position is not None:
+            return max(0, self.around_position - self.limit // 2)
+        return super().get_offset(request)
+
+    def get_next_link(self):
+        # Page links continue from the current offset instead of re-centring
+        link = super().get_next_link()
+        return link and remove_query_param(link, self.around_query_param)
+
+    def get_previous_link(self):
+        link = super().get_previous_link()
+        return link and remove_query_param(link, self.around_query_param)
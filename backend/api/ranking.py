@@ -0,0 +1,73 @@
+"""Cached all-time XP ranking for rank lookups and deep leaderboard pages
+
+Users are ranked by (-xp, id), the order the all-time leaderboard lists them
+in. Each process keeps a RankIndex snapshot of that order, rebuilt from the
+users xp index at most every RANK_INDEX_TTL seconds. Lookups are binary
+searches over the snapshot, so finding a rank costs O(log n) instead of
+counting every user above it.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .models import User
+
+# Seconds a snapshot is served before the next request rebuilds it
+RANK_INDEX_TTL = 60
+
+BUILD_CHUNK_SIZE = 10000
+
+
+class RankIndex:
+    """Users in rank order as parallel arrays of negated XP and id"""
+
+    def __init__(self, rows):
+        self.neg_xps = array('q')
+        self.ids = array('q')
+        for user_id, xp in rows:
+            self.neg_xps.append(-xp)
+            self.ids.append(user_id)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        rows = User.objects.order_by('-xp', 'id').values_list('id', 'xp').iterator(chunk_size=BUILD_CHUNK_SIZE)
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def is_stale(self):
+        return time.monotonic() - self.built_at > RANK_INDEX_TTL
+
+    def position(self, user_id, xp):
+        """0-based position a user with `xp` holds, or would hold, in rank order"""
+        # Users with equal XP are ordered by id, so search the tie block by id
+        lo = bisect_left(self.neg_xps, -xp)
+        hi = bisect_right(self.neg_xps, -xp, lo)
+        return bisect_left(self.ids, user_id, lo, hi)
+
+    def rank(self, user_id, xp):
+        return self.position(user_id, xp) + 1
+
+
+_rank_index = None
+_rank_index_lock = threading.Lock()
+
+
+def get_rank_index():
+    """Return the current RankIndex, rebuilding it once it is older than RANK_INDEX_TTL"""
+    global _rank_index
+    index = _rank_index
+    if index is not None and not index.is_stale():
+        return index
+    # While one request rebuilds, others keep answering from the stale snapshot
+    if not _rank_index_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _rank_index is None or _rank_index.is_stale():
+            _rank_index = RankIndex.build()
+        return _rank_index
+    finally:
+        _rank_index_lock.release()
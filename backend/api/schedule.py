@@ -0,0 +1,111 @@
+"""Parsing of the free-form session date/time strings into datetimes"""
+import re
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+# Used as the end time when a session only states when it starts
+DEFAULT_SESSION_LENGTH = timedelta(hours=1)
+
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%B %d %Y',
+    '%b %d %Y',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+]
+
+# Formats without a year; the year is inferred from a reference date
+YEARLESS_DATE_FORMATS = [
+    '%B %d',
+    '%b %d',
+    '%d %B',
+    '%d %b',
+]
+
+TIME_FORMATS = [
+    '%I:%M %p',
+    '%I %p',
+    '%H:%M',
+    '%H:%M:%S',
+]
+
+_WEEKDAY_RE = re.compile(r'^(mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?,?\s+', re.IGNORECASE)
+_ORDINAL_RE = re.compile(r'(\d+)(st|nd|rd|th)\b', re.IGNORECASE)
+_TIME_RANGE_RE = re.compile(r'\s*(?:-|–|—|\bto\b)\s*', re.IGNORECASE)
+_MERIDIEM_RE = re.compile(r'(\d)\s*([ap])\.?m\.?$', re.IGNORECASE)
+
+
+def parse_session_date(value, reference=None):
+    """Parse a session date string such as '2025-10-22' or 'Wednesday, October 22nd'.
+
+    Dates without a year take the reference date's year, rolling over to the
+    next year if that would put them more than six months in the past.
+    """
+    if not value:
+        return None
+    text = _ORDINAL_RE.sub(r'\1', _WEEKDAY_RE.sub('', value.strip()))
+    text = ' '.join(text.replace(',', ' ').split())
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+
+    reference = reference or timezone.localdate()
+    for fmt in YEARLESS_DATE_FORMATS:
+        try:
+            # Parse with an explicit year so February 29th is accepted
+            parsed = datetime.strptime(f'{text} 2000', f'{fmt} %Y').date()
+        except ValueError:
+            continue
+        try:
+            candidate = parsed.replace(year=reference.year)
+            if candidate < reference - timedelta(days=183):
+                candidate = candidate.replace(year=reference.year + 1)
+        except ValueError:
+            return None
+        return candidate
+    return None
+
+
+def parse_session_time(value):
+    """Parse a single time of day such as '8:00 AM', '8pm' or '14:30'"""
+    text = _MERIDIEM_RE.sub(r'\1 \2M', value.strip()).upper()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_session_schedule(date_value, time_value, reference=None):
+    """Return aware (starts_at, ends_at) for a session's date and time strings.
+
+    `time_value` may be a single time or a range like '8:00 AM - 10:00 AM'.
+    Returns (None, None) when the strings cannot be understood.
+    """
+    day = parse_session_date(date_value, reference=reference)
+    if day is None or not time_value:
+        return None, None
+
+    parts = _TIME_RANGE_RE.split(time_value.strip(), maxsplit=1)
+    start_time = parse_session_time(parts[0])
+    if start_time is None:
+        return None, None
+    end_time = parse_session_time(parts[1]) if len(parts) > 1 else None
+
+    tz = timezone.get_default_timezone()
+    starts_at = timezone.make_aware(datetime.combine(day, start_time), tz)
+    if end_time is None:
+        return starts_at, starts_at + DEFAULT_SESSION_LENGTH
+
+    ends_at = timezone.make_aware(datetime.combine(day, end_time), tz)
+    if ends_at <= starts_at:
+        # Ranges such as "10:00 PM - 1:00 AM" end on the following day
+        ends_at += timedelta(days=1)
+    return starts_at, ends_at
@@ -0,0 +1,201 @@
+"""Full-text search over study sessions
+
+PostgreSQL matches against GIN-indexed tsvector expressions (created in
+migration 0007). SQLite matches against an FTS5 table that triggers keep in
+sync with study_sessions (see ensure_sqlite_search_index). Other backends fall
+back to unindexed icontains matching.
+
+Word matching is by prefix, and each term may match a different field: the
+title, course code, description or group name. Every backend also matches
+the query as a substring of the course code ("cs" finds "22CS3AEFWD"); on
+PostgreSQL that uses the trigram index from migration 0017.
+
+Every backend annotates matching rows with ``search_rank`` (higher is better).
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+# Text search configuration; must match the index expressions in migration 0007
+SEARCH_CONFIG = 'simple'
+
+MAX_SEARCH_TERMS = 8
+
+SESSION_FTS_TABLE = 'study_sessions_fts'
+
+_TERM_RE = re.compile(r'\w+')
+
+_FTS_ROW = f"""
+    INSERT INTO {SESSION_FTS_TABLE}(rowid, title, course_code, description, group_name)
+    VALUES (new.id, new.title, new.course_code, new.description,
+            COALESCE((SELECT name FROM study_groups WHERE id = new.group_id), ''));
+"""
+
+SQLITE_SEARCH_TRIGGERS = {
+    'study_sessions_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS study_sessions_fts_ai AFTER INSERT ON study_sessions BEGIN
+            {_FTS_ROW}
+        END
+    """,
+    'study_sessions_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS study_sessions_fts_au AFTER UPDATE ON study_sessions BEGIN
+            DELETE FROM {SESSION_FTS_TABLE} WHERE rowid = old.id;
+            {_FTS_ROW}
+        END
+    """,
+    'study_sessions_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS study_sessions_fts_ad AFTER DELETE ON study_sessions BEGIN
+            DELETE FROM {SESSION_FTS_TABLE} WHERE rowid = old.id;
+        END
+    """,
+    'study_groups_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS study_groups_fts_au AFTER UPDATE OF name ON study_groups BEGIN
+            UPDATE {SESSION_FTS_TABLE} SET group_name = new.name
+            WHERE rowid IN (SELECT id FROM study_sessions WHERE group_id = new.id);
+        END
+    """,
+}
+
+
+def search_terms(q):
+    """Split a user query into at most MAX_SEARCH_TERMS lowercase word tokens"""
+    return _TERM_RE.findall(q.lower())[:MAX_SEARCH_TERMS]
+
+
+def course_code_fragment(q):
+    """The query as a course code substring; codes contain no spaces"""
+    return ''.join(q.split())
+
+
+def search_document(*fields):
+    """to_tsvector(SEARCH_CONFIG, COALESCE(a, '') || ' ' || COALESCE(b, '') ...)
+
+    Spelled out instead of using SearchVector so that the index expressions
+    in migration 0007 and the query expressions are the same IMMUTABLE SQL by
+    construction, whichever Django version compiles them.
+    """
+    from django.contrib.postgres.search import SearchVectorField
+    return Func(
+        *[Coalesce(F(field), Value(''), output_field=TextField()) for field in fields],
+        function='to_tsvector',
+        template=f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)",
+        arg_joiner=" || ' ' || ",
+        output_field=SearchVectorField(),
+    )
+
+
+def session_search_vector():
+    return search_document('title', 'course_code', 'description')
+
+
+def group_search_vector():
+    return search_document('name')
+
+
+def search_sessions(queryset, q):
+    """Filter a StudySession queryset to rows where every term in `q` prefix-matches
+    one of title, course code, description or group name (terms may match different
+    fields), or whose course code contains `q`, annotated with search_rank"""
+    terms = search_terms(q)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, terms, course_code_fragment(q))
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, terms, course_code_fragment(q))
+    return _search_fallback(queryset, terms, course_code_fragment(q))
+
+
+def _search_postgresql(queryset, terms, fragment):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+    from .models import StudyGroup
+
+    vector = session_search_vector()
+    # Ids only: drop the model's default ordering from every UNION branch
+    sessions = queryset.model.objects.order_by()
+    # Like SQLite's FTS document, each term may match a session field or the
+    # group name. Per-term UNIONs keep both GIN indexes usable, where one
+    # tsvector across the join could not be indexed.
+    word_matches = sessions
+    for term in terms:
+        term_query = SearchQuery(f'{term}:*', config=SEARCH_CONFIG, search_type='raw')
+        matching_groups = StudyGroup.objects.annotate(
+            search_document=group_search_vector()
+        ).filter(search_document=term_query).values('id')
+        word_matches = word_matches.filter(id__in=sessions.annotate(
+            search_document=vector
+        ).filter(search_document=term_query).values('id').union(
+            sessions.filter(group_id__in=matching_groups).values('id'),
+        ))
+    # OR-ing the course code match would scan every session; a UNION uses its index
+    matching_ids = word_matches.values('id').union(sessions.filter(course_code__icontains=fragment).values('id'))
+    query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+    document = search_document('title', 'course_code', 'description', 'group__name')
+    return queryset.filter(id__in=matching_ids).annotate(search_rank=SearchRank(document, query))
+
+
+def _search_sqlite(queryset, terms, fragment):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    table = queryset.model._meta.db_table
+    matching_ids = f'SELECT rowid FROM {SESSION_FTS_TABLE} WHERE {SESSION_FTS_TABLE} MATCH %s'
+    # bm25() is lower-is-better, so negate it to keep search_rank descending like Postgres
+    rank = (
+        f'SELECT -bm25({SESSION_FTS_TABLE}) FROM {SESSION_FTS_TABLE} '
+        f'WHERE {SESSION_FTS_TABLE} MATCH %s AND rowid = "{table}"."id"'
+    )
+    return queryset.filter(
+        Q(id__in=RawSQL(matching_ids, (match,))) | Q(course_code__icontains=fragment)
+    ).annotate(
+        # Course code matches that are not word matches have no bm25 score
+        search_rank=Coalesce(RawSQL(rank, (match,), output_field=FloatField()), 0.0)
+    )
+
+
+def _search_fallback(queryset, terms, fragment):
+    matches = Q()
+    for term in terms:
+        matches &= (
+            Q(title__icontains=term) | Q(course_code__icontains=term) |
+            Q(description__icontains=term) | Q(group__name__icontains=term)
+        )
+    return queryset.filter(matches | Q(course_code__icontains=fragment)).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def ensure_sqlite_search_index(using='default', **kwargs):
+    """Create the FTS5 table and its sync triggers if missing (post_migrate handler).
+
+    SQLite drops a table's triggers whenever a migration rebuilds it, so this
+    runs after every migrate instead of once in a migration, and re-indexes
+    from scratch whenever a trigger had to be recreated.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if 'study_sessions' not in tables or 'study_groups' not in tables:
+            return
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing_triggers = {row[0] for row in cursor.fetchall()}
+        if SESSION_FTS_TABLE in tables and existing_triggers.issuperset(SQLITE_SEARCH_TRIGGERS):
+            return
+
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SESSION_FTS_TABLE} '
+            f'USING fts5(title, course_code, description, group_name)'
+        )
+        for sql in SQLITE_SEARCH_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f'DELETE FROM {SESSION_FTS_TABLE}')
+        cursor.execute(f"""
+            INSERT INTO {SESSION_FTS_TABLE}(rowid, title, course_code, description, group_name)
+            SELECT s.id, s.title, s.course_code, s.description, COALESCE(g.name, '')
+            FROM study_sessions s LEFT JOIN study_groups g ON g.id = s.group_id
+        """)
@@ -1,5 +1,54 @@
+from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
 from rest_framework import serializers
-from .models import User, StudySession, StudyGroup, SessionRSVP, GroupMembership, Badge, SessionMessage, SessionResource
+from .models import User, StudySession, StudyGroup, Badge, SessionMessage, SessionResource, ATTENDEE_PREVIEW_SIZE, MEMBER_PREVIEW_SIZE
+from .viewer import get_viewer
+
+# Related data UserProfileSerializer can include; see ?include= on /api/auth/me/
+PROFILE_INCLUDES = ('badges', 'groups')
+
+# Most groups one bulk moderation request may change
+MAX_BULK_MODERATION = 500
+
+
+def attendee_summary(user):
+    """Compact name/avatar representation of a session attendee"""
+    return {
+        'id': user.id,
+        'name': f"{user.first_name} {user.last_name}" if user.first_name else user.username,
+        'image': user.image if user.image else f"https://api.dicebear.com/7.x/avataaars/svg?seed={user.username}"
+    }
+
+
+def member_summary(user):
+    """Compact representation of a group member"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'image': user.image if user.image else f"https://api.dicebear.com/7.x/avataaars/svg?seed={user.username}"
+    }
+
+
+class ViewerSerializerMixin:
+    """Gives serializers access to the request-scoped ViewerContext"""
+
+    @property
+    def viewer(self):
+        return get_viewer(self.context.get('request'))
+
+    def load_viewer_state(self, instances):
+        """Batch-load the viewer data that serializing `instances` will read"""
+
+
+class ViewerListSerializer(serializers.ListSerializer):
+    """Loads the viewer's state for the whole page before serializing its rows"""
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.load_viewer_state(instances)
+        return super().to_representation(instances)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,7 +60,11 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
-    """Detailed user profile with badges and groups"""
+    """Detailed user profile with badges and groups.
+    
+    Pass `include` in the context (a set of 'badges'/'groups') to serialize
+    only some of the related data; everything is included by default.
+    """
     badges = serializers.SerializerMethodField()
     groups = serializers.SerializerMethodField()
     
@@ -20,17 +73,39 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'image', 'level', 'xp', 'is_staff', 'badges', 'groups', 'created_at']
         read_only_fields = ['id', 'level', 'xp', 'is_staff', 'created_at']
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        include = self.context.get('include', PROFILE_INCLUDES)
+        for name in PROFILE_INCLUDES:
+            if name not in include:
+                self.fields.pop(name)
+    
     def get_badges(self, obj):
         badges = obj.badges.all()
         return BadgeSerializer(badges, many=True).data
     
     def get_groups(self, obj):
-        memberships = obj.joined_groups.filter(status='approved')
+        # Prefetched with member counts by prefetch_profile()
+        groups = getattr(obj, 'approved_groups', None)
+        if groups is None:
+            groups = obj.joined_groups.filter(status='approved').with_members_count()
         return [{
             'id': group.id,
             'name': group.name,
-            'members_count': group.members.count()
-        } for group in memberships]
+            'members_count': group.members_count
+        } for group in groups]
+
+
+def prefetch_profile(user, include=PROFILE_INCLUDES):
+    """Load the related data UserProfileSerializer will render for `user`, one query each"""
+    lookups = []
+    if 'badges' in include:
+        lookups.append('badges')
+    if 'groups' in include:
+        groups = StudyGroup.objects.filter(status='approved').with_members_count()
+        lookups.append(Prefetch('joined_groups', queryset=groups, to_attr='approved_groups'))
+    prefetch_related_objects([user], *lookups)
+    return user
 
 
 class BadgeSerializer(serializers.ModelSerializer):
@@ -41,7 +116,7 @@ class BadgeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'earned_at']
 
 
-class StudyGroupSerializer(serializers.ModelSerializer):
+class StudyGroupSerializer(ViewerSerializerMixin, serializers.ModelSerializer):
     """Serializer for StudyGroup with creator and member info"""
     creator_name = serializers.CharField(source='creator.username', read_only=True)
     creator_image = serializers.SerializerMethodField()
@@ -55,6 +130,10 @@ class StudyGroupSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'subject', 'description', 'creator', 'creator_name', 'creator_image',
                   'members_count', 'members', 'member_images', 'is_member', 'status', 'created_at', 'updated_at']
         read_only_fields = ['id', 'creator', 'status', 'created_at', 'updated_at']
+        list_serializer_class = ViewerListSerializer
+    
+    def load_viewer_state(self, groups):
+        self.viewer.load_groups(group.id for group in groups)
     
     def get_creator_image(self, obj):
         if obj.creator.image:
@@ -62,28 +141,42 @@ class StudyGroupSerializer(serializers.ModelSerializer):
         return f"https://api.dicebear.com/7.x/avataaars/svg?seed={obj.creator.username}"
     
     def get_members_count(self, obj):
+        # Annotated by StudyGroupQuerySet.with_member_summary()
+        if hasattr(obj, 'members_count'):
+            return obj.members_count
         return obj.members.count()
     
+    def preview_members(self, obj):
+        memberships = getattr(obj, 'member_preview', None)
+        if memberships is None:
+            memberships = obj.groupmembership_set.select_related('user').order_by('joined_at', 'id')[:MEMBER_PREVIEW_SIZE]
+        return [membership.user for membership in memberships]
+    
     def get_members(self, obj):
-        members = obj.members.all()
-        return [{
-            'id': member.id,
-            'username': member.username,
-            'first_name': member.first_name,
-            'last_name': member.last_name,
-            'image': member.image if member.image else f"https://api.dicebear.com/7.x/avataaars/svg?seed={member.username}"
-        } for member in members]
+        """First few members only; the full list is served by the members action"""
+        return [member_summary(member) for member in self.preview_members(obj)]
     
     def get_member_images(self, obj):
-        members = obj.members.all()[:3]
-        return [member.image if member.image else f"https://api.dicebear.com/7.x/avataaars/svg?seed={member.username}" 
-                for member in members]
+        return [member_summary(member)['image'] for member in self.preview_members(obj)]
     
     def get_is_member(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.members.filter(id=request.user.id).exists()
-        return False
+        return self.viewer.is_group_member(obj.id)
+
+
+class AdminGroupSerializer(serializers.ModelSerializer):
+    """Moderation queue row; omits member data so queues cost one query per page"""
+    creator_name = serializers.CharField(source='creator.username', read_only=True)
+    
+    class Meta:
+        model = StudyGroup
+        fields = ['id', 'name', 'subject', 'description', 'creator', 'creator_name', 'status', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    """Serializer for moderating many pending groups at once"""
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BULK_MODERATION)
+    status = serializers.ChoiceField(choices=['approved', 'rejected'])
 
 
 class StudyGroupCreateSerializer(serializers.ModelSerializer):
@@ -93,7 +186,7 @@ class StudyGroupCreateSerializer(serializers.ModelSerializer):
         fields = ['name', 'subject', 'description']
 
 
-class StudySessionSerializer(serializers.ModelSerializer):
+class StudySessionSerializer(ViewerSerializerMixin, serializers.ModelSerializer):
     """Serializer for StudySession with host and attendee info"""
     host_name = serializers.CharField(source='host.username', read_only=True)
     host_image = serializers.SerializerMethodField()
@@ -107,10 +200,15 @@ class StudySessionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = StudySession
-        fields = ['id', 'title', 'course_code', 'description', 'date', 'time', 'location',
+        fields = ['id', 'title', 'course_code', 'description', 'date', 'time', 'starts_at', 'ends_at', 'location',
                   'host', 'host_name', 'host_image', 'group', 'group_name', 
                   'attendees_count', 'attendees_list', 'is_attending', 'has_attended', 'is_group_member', 'verification_code', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'host', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'host', 'starts_at', 'ends_at', 'created_at', 'updated_at']
+        list_serializer_class = ViewerListSerializer
+    
+    def load_viewer_state(self, sessions):
+        self.viewer.load_sessions(session.id for session in sessions)
+        self.viewer.load_groups(session.group_id for session in sessions if session.group_id)
     
     def get_host_image(self, obj):
         if obj.host.image:
@@ -118,50 +216,55 @@ class StudySessionSerializer(serializers.ModelSerializer):
         return f"https://api.dicebear.com/7.x/avataaars/svg?seed={obj.host.username}"
     
     def get_attendees_count(self, obj):
+        # Annotated by StudySessionQuerySet.with_attendee_summary()
+        if hasattr(obj, 'attendees_count'):
+            return obj.attendees_count
         return obj.attendees.count()
     
     def get_attendees_list(self, obj):
-        attendees = obj.attendees.all()
-        return [{
-            'name': f"{attendee.first_name} {attendee.last_name}" if attendee.first_name else attendee.username,
-            'image': attendee.image if attendee.image else f"https://api.dicebear.com/7.x/avataaars/svg?seed={attendee.username}"
-        } for attendee in attendees]
+        """First few attendees only; the full roster is served by the attendees action"""
+        rsvps = getattr(obj, 'attendee_preview', None)
+        if rsvps is None:
+            rsvps = obj.sessionrsvp_set.select_related('user').order_by('created_at', 'id')[:ATTENDEE_PREVIEW_SIZE]
+        return [attendee_summary(rsvp.user) for rsvp in rsvps]
     
     def get_is_attending(self, obj):
         """Check if user has RSVP'd to the session"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.attendees.filter(id=request.user.id).exists()
-        return False
+        return self.viewer.is_attending(obj.id)
     
     def get_has_attended(self, obj):
         """Check if user has marked attendance (verified with code)"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                rsvp = SessionRSVP.objects.get(user=request.user, session=obj)
-                return rsvp.attended
-            except SessionRSVP.DoesNotExist:
-                return False
-        return False
+        return self.viewer.has_attended(obj.id)
     
     def get_is_group_member(self, obj):
         """Check if user is a member of the session's group"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            if obj.group:
-                return GroupMembership.objects.filter(user=request.user, group=obj.group).exists()
-            return True  # Sessions without a group are open to all
-        return False
+        if not self.viewer.is_authenticated:
+            return False
+        if obj.group_id:
+            return self.viewer.is_group_member(obj.group_id)
+        return True  # Sessions without a group are open to all
     
     def get_verification_code(self, obj):
         """Return verification code only if the requesting user is the host"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated and obj.host.id == request.user.id:
+        if self.viewer.is_user(obj.host_id):
             return obj.verification_code
         return None
 
 
+class DashboardSessionSerializer(serializers.ModelSerializer):
+    """Upcoming session row on the dashboard; independent of the viewer so it can be cached"""
+    host_name = serializers.CharField(source='host.username', read_only=True)
+    group_name = serializers.CharField(source='group.name', read_only=True, allow_null=True)
+    # Annotated by StudySessionQuerySet.with_attendees_count()
+    attendees_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = StudySession
+        fields = ['id', 'title', 'course_code', 'date', 'time', 'starts_at', 'ends_at', 'location',
+                  'host', 'host_name', 'group', 'group_name', 'attendees_count']
+        read_only_fields = fields
+
+
 class StudySessionCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating study sessions"""
     class Meta:
@@ -178,13 +281,17 @@ class LeaderboardSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'first_name', 'last_name', 'image', 'xp', 'level', 'badge']
     
     def get_badge(self, obj):
-        latest_badge = obj.badges.first()
+        # Annotated by UserQuerySet.with_latest_badge()
+        if hasattr(obj, 'latest_badge'):
+            latest_badge = obj.latest_badge
+        else:
+            latest_badge = obj.badges.values_list('name', flat=True).first()
         if latest_badge:
-            return latest_badge.name
+            return latest_badge
         return 'Rising Star'  # Default badge
 
 
-class SessionMessageSerializer(serializers.ModelSerializer):
+class SessionMessageSerializer(ViewerSerializerMixin, serializers.ModelSerializer):
     """Serializer for session chat messages"""
     sender_name = serializers.SerializerMethodField()
     sender_image = serializers.SerializerMethodField()
@@ -206,13 +313,35 @@ class SessionMessageSerializer(serializers.ModelSerializer):
         return f"https://api.dicebear.com/7.x/avataaars/svg?seed={obj.sender.username}"
     
     def get_is_current_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.sender.id == request.user.id
-        return False
+        return self.viewer.is_user(obj.sender_id)
+
+
+# Columns loaded for the compact (?shape=compact) chat payload
+COMPACT_MESSAGE_FIELDS = ('id', 'sender_id', 'text', 'created_at')
+
+
+def serialize_compact_messages(rows):
+    """Serialize `.values(*COMPACT_MESSAGE_FIELDS)` rows as a table of senders,
+    sent once, plus messages that reference senders by id"""
+    sender_ids = {row['sender_id'] for row in rows}
+    senders = User.objects.filter(id__in=sender_ids).values('id', 'username', 'first_name', 'last_name', 'image')
+    return {
+        'senders': {
+            sender['id']: {
+                'name': f"{sender['first_name']} {sender['last_name']}".strip() or sender['username'],
+                'image': sender['image'] or f"https://api.dicebear.com/7.x/avataaars/svg?seed={sender['username']}",
+            } for sender in senders
+        },
+        'results': [{
+            'id': row['id'],
+            'sender': row['sender_id'],
+            'text': row['text'],
+            'created_at': row['created_at'],
+        } for row in rows],
+    }
 
 
-class SessionResourceSerializer(serializers.ModelSerializer):
+class SessionResourceSerializer(ViewerSerializerMixin, serializers.ModelSerializer):
     """Serializer for session resources"""
     added_by_name = serializers.SerializerMethodField()
     added_by_image = serializers.SerializerMethodField()
@@ -235,16 +364,12 @@ class SessionResourceSerializer(serializers.ModelSerializer):
         return f"https://api.dicebear.com/7.x/avataaars/svg?seed={obj.added_by.username}"
     
     def get_is_owner(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.added_by.id == request.user.id
-        return False
+        return self.viewer.is_user(obj.added_by_id)
     
     def get_can_delete(self, obj):
         """Check if user can delete (host or resource owner)"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            # User is the resource owner or the session host
-            return obj.added_by.id == request.user.id or obj.session.host.id == request.user.id
-        return False
+        # Views that already know the host pass it in to avoid loading the session
+        host_id = self.context.get('session_host_id') or obj.session.host_id
+        # User is the resource owner or the session host
+        return self.viewer.is_user(obj.added_by_id) or self.viewer.is_user(host_id)
 
@@ -0,0 +1,91 @@
+"""Server-sent event stream of live session activity (requires ASGI)
+
+Django 4.2 does not notice when a client disconnects from a streaming
+response, and uvicorn silently drops what is sent afterwards, so an abandoned
+stream would hold its broker subscription forever. Each stream therefore ends
+after STREAM_MAX_AGE seconds and the browser's EventSource reconnects.
+"""
+import asyncio
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import AuthenticationFailed
+
+from authentication.authentication import CachedJWTAuthentication
+
+from .events import get_broker, session_channel, encode_event
+from .models import SessionRSVP
+
+# Seconds between keep-alive comments so proxies do not close idle streams
+KEEPALIVE_INTERVAL = 15
+
+# Milliseconds browsers wait before reconnecting a dropped stream
+RECONNECT_DELAY = 3000
+
+# Seconds a stream stays open before the client has to reconnect
+STREAM_MAX_AGE = 300
+
+
+def authenticate_stream_request(request):
+    """Resolve the user from a Bearer header or, since EventSource cannot set
+    headers, from a ?token= query parameter"""
+    authentication = CachedJWTAuthentication()
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {encode_event(event['data'])}\n\n"
+
+
+async def event_stream(channel):
+    yield f'retry: {RECONNECT_DELAY}\n\n'
+    deadline = monotonic() + STREAM_MAX_AGE
+    async with get_broker().subscribe(channel) as subscription:
+        while True:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(KEEPALIVE_INTERVAL, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+
+
+async def session_events(request, pk):
+    """Stream new messages, RSVPs, attendance marks and resources for a session.
+
+    Clients should refetch messages with ?after_id= on every (re)connect and on
+    a `resync` event, since events published while disconnected are not replayed.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django would buffer the endless stream; clients fall back to polling
+        return JsonResponse({'detail': 'Event streams require the ASGI server'}, status=501)
+
+    user = await sync_to_async(authenticate_stream_request)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    is_attendee = await SessionRSVP.objects.filter(session_id=pk, user=user).aexists()
+    if not is_attendee:
+        return JsonResponse({'detail': 'You must be attending this session to follow its events'}, status=403)
+
+    response = StreamingHttpResponse(event_stream(session_channel(pk)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Ask nginx-style proxies not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
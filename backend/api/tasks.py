@@ -0,0 +1,211 @@
+"""Database-backed queue for side effects of requests (outbox pattern)
+
+Views call enqueue() inside the transaction that makes a change, so a task
+exists exactly when its cause was committed. `manage.py run_tasks` workers
+claim due tasks in batches and run them. Failed tasks are retried with
+exponential backoff until max_attempts.
+
+A task is deleted in the same transaction as its handler's writes. If a
+worker crashes or its lease expires before it commits, everything rolls back
+and the task runs again, so each task's effects are applied exactly once.
+Handlers registered with batch=True receive every claimed payload of their
+kind at once, so a burst of XP awards becomes a single award_xp_many call.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .badges import award_badges, increment_counters
+from .models import Task
+from .utils import award_xp_many, XP_REWARDS
+
+logger = logging.getLogger(__name__)
+
+# Seconds a claimed batch stays leased to its worker before others may retry it
+TASK_LEASE_SECONDS = 300
+
+# First retry delay in seconds; doubles with every failed attempt
+RETRY_BASE_DELAY = 10
+
+_handlers = {}
+
+
+class LeaseLost(Exception):
+    """Another worker reclaimed the task while it was running"""
+
+
+def task(name, batch=False):
+    """Register a handler called as fn(**payload), or fn(payloads) when batch=True"""
+    def register(fn):
+        _handlers[name] = (fn, batch)
+        return fn
+    return register
+
+
+def enqueue(name, **payload):
+    """Queue a task; call it inside the transaction whose changes the task follows up on.
+
+    With TASK_QUEUE_EAGER the task still gets a row, but runs as soon as the
+    transaction commits; if it fails it is retried by the next run_tasks like
+    any other task instead of being lost.
+    """
+    if name not in _handlers:
+        raise ValueError(f'Unknown task: {name}')
+    task = Task.objects.create(name=name, payload=payload)
+    if settings.TASK_QUEUE_EAGER:
+        # Handler errors are recorded on the task by run_tasks; anything else
+        # (e.g. the database going away) leaves it pending for run_tasks
+        transaction.on_commit(lambda: run_tasks(claim_tasks(1, ids=[task.id])), robust=True)
+    return task
+
+
+def run_handler(name, payloads):
+    handler, batch = _handlers[name]
+    if batch:
+        handler(payloads)
+    else:
+        for payload in payloads:
+            handler(**payload)
+
+
+def due_tasks(now):
+    # Running tasks whose lease expired belong to a worker that died or stalled
+    return Task.objects.filter(
+        Q(status='pending', run_after__lte=now) | Q(status='running', locked_until__lt=now)
+    )
+
+
+def claim_tasks(batch_size, ids=None):
+    """Lease up to `batch_size` due tasks (optionally only those in `ids`) to this worker and return them"""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    candidates = due_tasks(now) if ids is None else due_tasks(now).filter(id__in=ids)
+    with transaction.atomic():
+        ids = list(
+            candidates.order_by('run_after', 'id').select_for_update(skip_locked=True)
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        # Re-checking due-ness keeps two workers from claiming the same task on
+        # databases without SELECT ... FOR UPDATE SKIP LOCKED (SQLite)
+        due_tasks(now).filter(id__in=ids).update(
+            status='running',
+            locked_by=token,
+            locked_until=now + timedelta(seconds=TASK_LEASE_SECONDS),
+            attempts=F('attempts') + 1,
+        )
+    return list(Task.objects.filter(locked_by=token, status='running').order_by('id'))
+
+
+def complete(tasks):
+    """Run tasks' handler and delete the tasks in one transaction"""
+    with transaction.atomic():
+        run_handler(tasks[0].name, [task.payload for task in tasks])
+        deleted, _ = Task.objects.filter(
+            id__in=[task.id for task in tasks], locked_by=tasks[0].locked_by
+        ).delete()
+        if deleted != len(tasks):
+            raise LeaseLost(f'Lease expired for {tasks[0].name} tasks')
+
+
+def record_failure(tasks, error):
+    now = timezone.now()
+    for task in tasks:
+        retry = task.attempts < task.max_attempts
+        Task.objects.filter(id=task.id, locked_by=task.locked_by).update(
+            status='pending' if retry else 'failed',
+            run_after=now + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (task.attempts - 1)) if retry else task.run_after,
+            locked_by='',
+            locked_until=None,
+            last_error=error,
+        )
+
+
+def run_pending_tasks(batch_size=100):
+    """Claim and run one batch of due tasks; returns how many were claimed"""
+    tasks = claim_tasks(batch_size)
+    run_tasks(tasks)
+    return len(tasks)
+
+
+def run_tasks(tasks):
+    """Run claimed tasks, recording failures for retry"""
+    by_name = defaultdict(list)
+    for task in tasks:
+        by_name[task.name].append(task)
+
+    for name, group in by_name.items():
+        if name not in _handlers:
+            record_failure(group, f'Unknown task: {name}')
+            continue
+        # Batch handlers succeed or fail as a group; others one task at a time
+        units = [group] if _handlers[name][1] else [[task] for task in group]
+        for unit in units:
+            try:
+                complete(unit)
+            except Exception as exc:
+                logger.exception('Task %s failed (attempt %s)', name, unit[0].attempts)
+                record_failure(unit, f'{type(exc).__name__}: {exc}')
+
+
+@task('award_xp', batch=True)
+def award_xp_task(payloads):
+    """Apply queued XP awards with one award_xp_many call per reason and day earned.
+
+    Awards are dated when they were queued, not when the worker gets to them,
+    so a backlog or retry never moves XP into a later leaderboard period. Each
+    call's ledger rows carry the latest award time among its payloads.
+    """
+    amounts_by_key = defaultdict(lambda: defaultdict(int))
+    occurred_by_key = {}
+    for payload in payloads:
+        occurred_at = parse_datetime(payload['occurred_at'])
+        key = (payload.get('reason', ''), timezone.localdate(occurred_at))
+        amounts_by_key[key][payload['user_id']] += payload['amount']
+        occurred_by_key[key] = max(occurred_by_key.get(key, occurred_at), occurred_at)
+    totals = {}
+    for key, amounts in amounts_by_key.items():
+        totals.update(award_xp_many(amounts, reason=key[0], occurred_at=occurred_by_key[key]))
+    award_badges({(user_id, 'xp'): xp for user_id, (xp, _) in totals.items()})
+
+
+@task('count_activity', batch=True)
+def count_activity_task(payloads):
+    """Apply queued activity counter changes and award the badges they unlock"""
+    increments = defaultdict(int)
+    for payload in payloads:
+        for user_id, counter, amount in payload['changes']:
+            increments[(user_id, counter)] += amount
+    increments = {key: amount for key, amount in increments.items() if amount}
+    if increments:
+        award_badges(increment_counters(increments))
+
+
+def enqueue_xp_award(user, reason):
+    """Queue the XP_REWARDS[reason] award for `user`"""
+    return enqueue(
+        'award_xp', user_id=user.id, amount=XP_REWARDS[reason], reason=reason,
+        occurred_at=timezone.now().isoformat(),
+    )
+
+
+def enqueue_counter_changes(changes):
+    """Queue {(user_id, counter): delta} activity counter changes (see api.badges)"""
+    if not changes:
+        return None
+    return enqueue('count_activity', changes=[
+        [user_id, counter, amount] for (user_id, counter), amount in changes.items()
+    ])
+
+
+def enqueue_activity(user, counters, amount=1):
+    """Queue `amount` (default +1) on each of `user`'s named activity counters"""
+    return enqueue_counter_changes({(user.id, counter): amount for counter in counters})
@@ -1,3 +1,94 @@
+import asyncio
+from unittest import mock
+
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
 from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from studysphere.asgi import application
+
+from .events import get_broker, session_channel
+from .models import SessionRSVP, StudyGroup, StudySession, User
+from .search import search_sessions
+
+
+class SessionEventStreamTests(TestCase):
+    def setUp(self):
+        # Like the test client, keep the ASGI handler from closing the test transaction's connection
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+
+        self.user = User.objects.create_user(username='attendee', password='password')
+        self.session = StudySession.objects.create(
+            title='Graphs', course_code='CS201', description='Review', date='2024-01-01',
+            time='8:00 AM - 10:00 AM', location='Online', host=self.user,
+        )
+        SessionRSVP.objects.create(user=self.user, session=self.session)
+
+    async def test_disconnected_stream_releases_its_subscription(self):
+        broker = get_broker()
+        channel = session_channel(self.session.pk)
+        token = AccessToken.for_user(self.user)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': f'/api/sessions/{self.session.pk}/events/', 'raw_path': b'',
+            'query_string': f'token={token}'.encode(), 'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        disconnected = False
+        sent = []
+
+        async def receive():
+            if disconnected:
+                return {'type': 'http.disconnect'}
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            # uvicorn silently drops everything sent after the client went away
+            if not disconnected:
+                sent.append(message)
+
+        with mock.patch('api.streams.STREAM_MAX_AGE', 0.5):
+            handler = asyncio.create_task(application(scope, receive, send))
+            while not broker.subscriber_count(channel) and not handler.done():
+                await asyncio.sleep(0.01)
+            self.assertEqual(sent[0]['status'], 200)
+            self.assertEqual(broker.subscriber_count(channel), 1)
+
+            disconnected = True
+            await asyncio.wait_for(handler, timeout=5)
+
+        self.assertEqual(broker.subscriber_count(channel), 0)
+
+
+class SessionSearchTests(TestCase):
+    def setUp(self):
+        host = User.objects.create_user(username='host', password='password')
+        group = StudyGroup.objects.create(
+            name='Algorithms Circle', subject='CS', description='Weekly', creator=host, status='approved',
+        )
+
+        def create_session(title, course_code, group=None):
+            return StudySession.objects.create(
+                title=title, course_code=course_code, description='Review', date='2024-01-01',
+                time='8:00 AM - 10:00 AM', location='Online', host=host, group=group,
+            )
+
+        self.split_match = create_session('Graph theory', 'CS301', group)
+        self.title_match = create_session('Graph algorithms', 'CS302')
+        self.graph_only = create_session('Graph theory', 'CS303')
+        self.group_only = create_session('Sorting', 'CS304', group)
+
+    def search(self, q):
+        return set(search_sessions(StudySession.objects.all(), q))
+
+    def test_terms_may_match_different_fields(self):
+        # "graph" is in the title and "algorithms" in the group name
+        self.assertEqual(self.search('graph algorithms'), {self.split_match, self.title_match})
 
-# Create your tests here.
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('sorting circle'), {self.group_only})
+        self.assertEqual(self.search('graph sorting'), set())
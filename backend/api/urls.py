@@ -1,5 +1,6 @@
 from rest_framework import routers
 from django.urls import path, include
+from .streams import session_events
 from .views import (
     StudySessionViewSet,
     StudyGroupViewSet,
@@ -16,5 +17,6 @@ router.register(r'dashboard', DashboardViewSet, basename='dashboard')
 router.register(r'admin/groups', AdminViewSet, basename='admin')
 
 urlpatterns = [
+    path('sessions/<int:pk>/events/', session_events, name='session-events'),
     path('', include(router.urls)),
 ]
@@ -1,25 +1,102 @@
 """Utility functions for XP and leveling system"""
+from datetime import timedelta
 
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.lookups import LessThan
+from django.utils import timezone
 
-def calculate_level(xp):
-    """Calculate level based on XP (every 500 XP = 1 level)"""
-    if xp < 500:
-        return 1
-    elif xp < 1000:
-        return 2
-    elif xp < 1500:
-        return 3
-    elif xp < 2000:
-        return 4
-    else:
-        return 5 + (xp - 2000) // 1000
-
-
-def award_xp(user, amount):
-    """Award XP to a user and update their level"""
-    user.xp += amount
-    user.level = calculate_level(user.xp)
-    user.save()
+from authentication.authentication import invalidate_cached_users
+
+from .models import User, XPEvent, XPRollup
+
+
+def level_expression(xp):
+    """Level for an XP expression: a level per 500 XP up to level 5 at 2000 XP,
+    then a level per 1000 XP"""
+    # Integer division truncates on PostgreSQL and SQLite, which equals floor for xp >= 2000
+    return Case(
+        When(LessThan(xp, 500), then=Value(1)),
+        When(LessThan(xp, 1000), then=Value(2)),
+        When(LessThan(xp, 1500), then=Value(3)),
+        When(LessThan(xp, 2000), then=Value(4)),
+        default=Value(5) + (xp - Value(2000)) / Value(1000),
+        output_field=IntegerField(),
+    )
+
+
+def amount_by_id(amounts, field='id'):
+    """Expression picking each row's amount from a {id: amount} dict"""
+    if len(set(amounts.values())) == 1:
+        return Value(next(iter(amounts.values())))
+    return Case(
+        *[When(**{field: key}, then=Value(amount)) for key, amount in amounts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def xp_period_starts(day):
+    """First day of each XPRollup period containing `day`"""
+    return {
+        'day': day,
+        'week': day - timedelta(days=day.weekday()),
+        'month': day.replace(day=1),
+    }
+
+
+def record_xp_rollups(amounts, day):
+    """Add XP to the day, week and month rollups containing `day`; `amounts` maps user id -> XP"""
+    periods = xp_period_starts(day)
+    # Make sure every row exists, then increment them all in one UPDATE, so
+    # concurrent awards never overwrite each other's totals
+    XPRollup.objects.bulk_create([
+        XPRollup(user_id=user_id, period=period, period_start=period_start, xp=0)
+        for user_id in amounts
+        for period, period_start in periods.items()
+    ], ignore_conflicts=True)
+    in_periods = Q()
+    for period, period_start in periods.items():
+        in_periods |= Q(period=period, period_start=period_start)
+    XPRollup.objects.filter(in_periods, user_id__in=amounts).update(
+        xp=F('xp') + amount_by_id(amounts, field='user_id')
+    )
+
+
+def award_xp_many(amounts, reason='', occurred_at=None):
+    """Award XP to many users with one UPDATE and record it in the XP ledger.
+
+    `amounts` maps user id -> XP. `occurred_at` (default now) is when the XP
+    was earned; it dates the ledger rows and picks the leaderboard periods.
+    Returns {user id: (xp, level)} with the new totals of every user that exists.
+    """
+    amounts = {user_id: amount for user_id, amount in amounts.items() if amount}
+    if not amounts:
+        return {}
+    occurred_at = occurred_at or timezone.now()
+
+    new_xp = F('xp') + amount_by_id(amounts)
+    with transaction.atomic():
+        User.objects.filter(id__in=amounts).update(xp=new_xp, level=level_expression(new_xp))
+        # The UPDATE holds the row locks until commit, so this reads our own result
+        totals = {
+            user_id: (xp, level)
+            for user_id, xp, level in User.objects.filter(id__in=amounts).values_list('id', 'xp', 'level')
+        }
+        XPEvent.objects.bulk_create([
+            XPEvent(user_id=user_id, amount=amounts[user_id], reason=reason, created_at=occurred_at)
+            for user_id in totals
+        ])
+        record_xp_rollups({user_id: amounts[user_id] for user_id in totals}, timezone.localdate(occurred_at))
+        invalidate_cached_users(totals)
+    return totals
+
+
+def award_xp(user, amount, reason='', occurred_at=None):
+    """Atomically award XP to a user, update their level and record it in the XP ledger"""
+    totals = award_xp_many({user.id: amount}, reason=reason, occurred_at=occurred_at)
+    if user.id in totals:
+        user.xp, user.level = totals[user.id]
     return user
 
 
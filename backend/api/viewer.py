@@ -0,0 +1,73 @@
+"""Request-scoped state about the user viewing an API response"""
+from .models import SessionRSVP, GroupMembership
+
+
+class ViewerContext:
+    """Membership data for the requesting user, loaded per page rather than per row.
+
+    List serializers call load_sessions()/load_groups() with every id on the
+    page, costing one query each; ids checked without being loaded first (a
+    detail view) are looked up on their own.
+    """
+
+    def __init__(self, user=None):
+        self.user = user if user is not None and user.is_authenticated else None
+        # Session id -> attended flag, for loaded sessions the viewer RSVP'd to
+        self._rsvps = {}
+        self._loaded_session_ids = set()
+        self._group_ids = set()
+        self._loaded_group_ids = set()
+
+    @property
+    def is_authenticated(self):
+        return self.user is not None
+
+    @property
+    def user_id(self):
+        return self.user.id if self.user is not None else None
+
+    def load_sessions(self, session_ids):
+        """Load the viewer's RSVPs to any of `session_ids` not loaded yet"""
+        missing = set(session_ids) - self._loaded_session_ids
+        if self.user is None or not missing:
+            return
+        self._rsvps.update(
+            SessionRSVP.objects.filter(user=self.user, session_id__in=missing).values_list('session_id', 'attended')
+        )
+        self._loaded_session_ids |= missing
+
+    def load_groups(self, group_ids):
+        """Load the viewer's memberships of any of `group_ids` not loaded yet"""
+        missing = set(group_ids) - self._loaded_group_ids
+        if self.user is None or not missing:
+            return
+        self._group_ids.update(
+            GroupMembership.objects.filter(user=self.user, group_id__in=missing).values_list('group_id', flat=True)
+        )
+        self._loaded_group_ids |= missing
+
+    def is_attending(self, session_id):
+        self.load_sessions([session_id])
+        return session_id in self._rsvps
+
+    def has_attended(self, session_id):
+        self.load_sessions([session_id])
+        return self._rsvps.get(session_id, False)
+
+    def is_group_member(self, group_id):
+        self.load_groups([group_id])
+        return group_id in self._group_ids
+
+    def is_user(self, user_id):
+        return self.user is not None and self.user.id == user_id
+
+
+def get_viewer(request):
+    """Return the ViewerContext for a request, building it on first use"""
+    if request is None:
+        return ViewerContext()
+    viewer = getattr(request, '_viewer_context', None)
+    if viewer is None:
+        viewer = ViewerContext(request.user)
+        request._viewer_context = viewer
+    return viewer
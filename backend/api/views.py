@@ -1,39 +1,185 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.utils.urls import replace_query_param
+from django.db import transaction
+from django.http import Http404
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Count, Q
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time
+from time import monotonic
+from django.db.models import Count, Exists, OuterRef, Q
 import random
 
-from .models import User, StudySession, StudyGroup, SessionRSVP, GroupMembership, SessionMessage, SessionResource
+from .models import (
+    User, StudySession, StudyGroup, SessionRSVP, GroupMembership, SessionMessage, SessionResource, XPRollup
+)
 from .serializers import (
-    StudySessionSerializer, StudySessionCreateSerializer,
-    StudyGroupSerializer, StudyGroupCreateSerializer,
+    StudySessionSerializer, StudySessionCreateSerializer, attendee_summary,
+    StudyGroupSerializer, StudyGroupCreateSerializer, AdminGroupSerializer, BulkModerationSerializer, member_summary,
     LeaderboardSerializer, UserProfileSerializer,
-    SessionMessageSerializer, SessionResourceSerializer
+    SessionMessageSerializer, SessionResourceSerializer,
+    COMPACT_MESSAGE_FIELDS, serialize_compact_messages
 )
 from .permissions import IsHostOrReadOnly, IsCreatorOrReadOnly, IsAdminUser
-from .utils import award_xp, XP_REWARDS
+from .pagination import (
+    CreatedAtCursorPagination, SessionCursorPagination, SearchResultPagination, AttendeeCursorPagination,
+    MessageHistoryPagination, MemberCursorPagination, RankPagination
+)
+from .search import search_sessions
+from .events import publish_session_event, message_waiters
+from .access import get_attending_session_host, invalidate_session_access
+from .ranking import get_rank_index
+from .badges import attendance_counters, hosting_counters, session_counters, group_counters, counter_changes
+from .dashboard import get_dashboard, invalidate_dashboards
+from .tasks import enqueue_activity, enqueue_counter_changes, enqueue_xp_award
+from .utils import xp_period_starts, XP_REWARDS
+
+# Session locations that the discover page treats as online
+ONLINE_LOCATIONS = ['Online', 'Discord Link']
+
+# Most messages returned by one incremental (after_id/since) chat fetch
+MAX_INCREMENTAL_MESSAGES = 200
+
+# Longest ?wait= a long-polling chat request may park for, in seconds; kept
+# under common 30s proxy timeouts
+MAX_LONG_POLL_WAIT = 25
+
+# Seconds between database re-checks while long-polling. A broker only wakes
+# requests for messages posted in its own process (InProcessBroker) or through
+# run_event_broker, so this bounds the latency of messages it never sees.
+LONG_POLL_RECHECK_INTERVAL = 5
+
+# Leaderboard periods answered from XPRollup rather than lifetime XP
+XP_ROLLUP_PERIODS = [value for value, _ in XPRollup.PERIOD_CHOICES]
+
+# Group statuses with a moderation queue, in display order
+MODERATION_STATUSES = [value for value, _ in StudyGroup.STATUS_CHOICES]
+
 
 #class based view
 class StudySessionViewSet(viewsets.ModelViewSet):
     """ViewSet for StudySession CRUD and RSVP"""
-    queryset = StudySession.objects.all().select_related('host', 'group').prefetch_related('attendees')
     permission_classes = [IsAuthenticatedOrReadOnly, IsHostOrReadOnly]
+    pagination_class = SessionCursorPagination
+    
+    def get_queryset(self):
+        queryset = StudySession.objects.all().select_related('host', 'group')
+        if self.action == 'list':
+            queryset = self.filter_list_queryset(queryset)
+        # Only the serialized list/detail views need attendee counts and previews
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.with_attendee_summary()
+        return queryset
+    
+    def filter_list_queryset(self, queryset):
+        """Apply ?q= search and the discover page filters"""
+        params = self.request.query_params
+        
+        if params.get('course_code'):
+            queryset = queryset.filter(course_code__iexact=params['course_code'].strip())
+        for param in ('group', 'host'):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({param: 'Must be an integer id'})
+                queryset = queryset.filter(**{f'{param}_id': int(value)})
+        
+        mode = params.get('mode')
+        if mode == 'online':
+            queryset = queryset.filter(location__in=ONLINE_LOCATIONS)
+        elif mode == 'in-person':
+            queryset = queryset.exclude(location__in=ONLINE_LOCATIONS)
+        
+        # Time windows are range scans on the starts_at/ends_at indexes
+        starts_after = self.parse_datetime_param('starts_after')
+        if starts_after:
+            queryset = queryset.filter(starts_at__gte=starts_after)
+        starts_before = self.parse_datetime_param('starts_before', end_of_day=True)
+        if starts_before:
+            queryset = queryset.filter(starts_at__lte=starts_before)
+        if params.get('upcoming') in ('1', 'true'):
+            queryset = queryset.filter(ends_at__gte=timezone.now())
+        if params.get('ordering') == 'starts_at':
+            # Keyset pagination on starts_at needs every row to have one
+            queryset = queryset.filter(starts_at__isnull=False)
+        
+        if params.get('q'):
+            queryset = search_sessions(queryset, params['q'])
+        return queryset
+    
+    def paginate_queryset(self, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            # Ranked search results are paged by offset (see SearchResultPagination)
+            self._paginator = SearchResultPagination()
+        return super().paginate_queryset(queryset)
+    
+    def parse_datetime_param(self, param, end_of_day=False):
+        """Parse an ISO date or datetime query parameter into an aware datetime"""
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError
+                parsed = datetime.combine(day, time.max if end_of_day else time.min)
+        except ValueError:
+            raise ValidationError({param: 'Must be an ISO 8601 date or datetime'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
     
     def get_serializer_class(self):
         if self.action == 'create':
             return StudySessionCreateSerializer
         return StudySessionSerializer
     
+    def get_attending_session_host(self, pk):
+        """Host id of session `pk` if the user attends it, else None; 404s for unknown sessions"""
+        if not str(pk).isdigit():
+            raise Http404
+        host_id = get_attending_session_host(int(pk), self.request.user)
+        if host_id is None and not StudySession.objects.filter(pk=pk).exists():
+            raise Http404
+        return host_id
+    
+    def perform_update(self, serializer):
+        # Moving a session in or out of a group or onto a weekend changes what it counts towards
+        attended_ids = list(
+            SessionRSVP.objects.filter(session=serializer.instance, attended=True).values_list('user_id', flat=True)
+        )
+        before = session_counters(serializer.instance, attended_ids)
+        with transaction.atomic():
+            session = serializer.save()
+            enqueue_counter_changes(counter_changes(before, session_counters(session, attended_ids)))
+        invalidate_dashboards(SessionRSVP.objects.filter(session=session).values_list('user_id', flat=True))
+    
+    def perform_destroy(self, instance):
+        # delete() clears instance.pk, so keep the id for cache invalidation
+        session_id = instance.pk
+        with transaction.atomic():
+            rsvps = list(SessionRSVP.objects.filter(session_id=session_id).values_list('user_id', 'attended'))
+            attended_ids = [user_id for user_id, attended in rsvps if attended]
+            enqueue_counter_changes(counter_changes(session_counters(instance, attended_ids), {}))
+            instance.delete()
+        attendee_ids = [user_id for user_id, _ in rsvps]
+        invalidate_session_access(session_id, attendee_ids)
+        invalidate_dashboards(attendee_ids + [instance.host_id])
+    
     def perform_create(self, serializer):
         # Generate random 6-digit verification code
         verification_code = ''.join([str(random.randint(0, 9)) for _ in range(6)])
-        session = serializer.save(host=self.request.user, verification_code=verification_code)
-        # Award XP for creating a session
-        award_xp(self.request.user, XP_REWARDS['create_session'])
+        with transaction.atomic():
+            session = serializer.save(host=self.request.user, verification_code=verification_code)
+            # Award XP for creating a session
+            enqueue_xp_award(self.request.user, 'create_session')
+            enqueue_activity(self.request.user, hosting_counters(session))
+        invalidate_dashboards([self.request.user.id])
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def rsvp(self, request, pk=None):
@@ -58,6 +204,9 @@ class StudySessionViewSet(viewsets.ModelViewSet):
         
         # Create RSVP without verification (attended=False by default)
         SessionRSVP.objects.create(user=request.user, session=session)
+        invalidate_session_access(session.id, [request.user.id])
+        invalidate_dashboards([request.user.id])
+        publish_session_event(session.id, 'rsvp.created', {'user': attendee_summary(request.user)})
         
         return Response(
             {'detail': 'Successfully RSVP\'d to session'},
@@ -99,12 +248,13 @@ class StudySessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Mark attendance
-        rsvp.attended = True
-        rsvp.save()
-        
-        # Award XP for attending (only after successful verification)
-        award_xp(request.user, XP_REWARDS['rsvp_session'])
+        # Mark attendance and award XP for attending (only after successful verification)
+        with transaction.atomic():
+            rsvp.attended = True
+            rsvp.save()
+            enqueue_xp_award(request.user, 'rsvp_session')
+            enqueue_activity(request.user, attendance_counters(session))
+        publish_session_event(session.id, 'attendance.marked', {'user': attendee_summary(request.user)})
         
         return Response(
             {'detail': 'Attendance marked successfully', 'xp_earned': XP_REWARDS['rsvp_session']},
@@ -118,7 +268,13 @@ class StudySessionViewSet(viewsets.ModelViewSet):
         
         try:
             rsvp = SessionRSVP.objects.get(user=request.user, session=session)
-            rsvp.delete()
+            with transaction.atomic():
+                rsvp.delete()
+                if rsvp.attended:
+                    enqueue_activity(request.user, attendance_counters(session), amount=-1)
+            invalidate_session_access(session.id, [request.user.id])
+            invalidate_dashboards([request.user.id])
+            publish_session_event(session.id, 'rsvp.cancelled', {'user': attendee_summary(request.user)})
             return Response({'detail': 'RSVP cancelled'}, status=status.HTTP_200_OK)
         except SessionRSVP.DoesNotExist:
             return Response(
@@ -126,29 +282,90 @@ class StudySessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
-    def messages(self, request, pk=None):
-        """Get all messages for a session"""
+    @action(detail=True, methods=['get'], pagination_class=AttendeeCursorPagination)
+    def attendees(self, request, pk=None):
+        """Get the full, paginated attendee roster for a session"""
         session = self.get_object()
-        
-        # Check if user is attending the session
-        if not session.attendees.filter(id=request.user.id).exists():
+        rsvps = SessionRSVP.objects.filter(session=session).select_related('user')
+        page = self.paginate_queryset(rsvps)
+        data = [attendee_summary(rsvp.user) for rsvp in page]
+        return self.get_paginated_response(data)
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated], pagination_class=MessageHistoryPagination)
+    def messages(self, request, pk=None):
+        """Get the latest session messages, newest first; `next` pages back
+        through older history with ?before_id=.
+        
+        With ?after_id= or ?since= only newer messages are returned, oldest
+        first, as a plain list so polling clients can append them. Adding
+        ?wait=N long-polls: if nothing is newer yet, the request parks for up
+        to N seconds until a message is posted to the session.
+        
+        ?shape=compact returns a `senders` table once plus messages that only
+        carry sender ids, instead of repeating sender details on every message.
+        """
+        # Check if user is attending the session (cached; skips loading the session)
+        host_id = self.get_attending_session_host(pk)
+        if host_id is None:
             return Response(
                 {'detail': 'You must be attending this session to view messages'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        messages = SessionMessage.objects.filter(session=session).select_related('sender')
-        serializer = SessionMessageSerializer(messages, many=True, context={'request': request})
-        return Response(serializer.data)
+        compact = request.query_params.get('shape') == 'compact'
+        messages = SessionMessage.objects.filter(session_id=pk)
+        if compact:
+            messages = messages.values(*COMPACT_MESSAGE_FIELDS)
+        else:
+            messages = messages.select_related('sender')
+        
+        def serialize(rows):
+            if compact:
+                return serialize_compact_messages(list(rows))
+            return SessionMessageSerializer(rows, many=True, context={'request': request}).data
+        
+        after_id = request.query_params.get('after_id')
+        since = self.parse_datetime_param('since')
+        if after_id or since:
+            if after_id:
+                if not after_id.isdigit():
+                    raise ValidationError({'after_id': 'Must be an integer id'})
+                messages = messages.filter(id__gt=int(after_id)).order_by('id')
+            else:
+                messages = messages.filter(created_at__gt=since).order_by('created_at', 'id')
+            newer = messages[:MAX_INCREMENTAL_MESSAGES]
+            
+            wait = request.query_params.get('wait')
+            if wait:
+                if not wait.isdigit():
+                    raise ValidationError({'wait': 'Must be a whole number of seconds'})
+                # Watch before querying so a message sent in between still wakes us
+                with message_waiters.watch(int(pk)) as new_message:
+                    result = list(newer)
+                    deadline = monotonic() + min(int(wait), MAX_LONG_POLL_WAIT)
+                    while not result and (remaining := deadline - monotonic()) > 0:
+                        new_message.wait(min(remaining, LONG_POLL_RECHECK_INTERVAL))
+                        # Re-query whether woken or not: the message may come from another process
+                        new_message.clear()
+                        result = list(newer.all())
+            else:
+                result = newer
+            return Response(serialize(result))
+        
+        page = self.paginate_queryset(messages)
+        data = serialize(page)
+        if not compact:
+            return self.get_paginated_response(data)
+        response = self.get_paginated_response(data['results'])
+        response.data['senders'] = data['senders']
+        return response
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def send_message(self, request, pk=None):
         """Send a message to the session chat"""
-        session = self.get_object()
-        
-        # Check if user is attending the session
-        if not session.attendees.filter(id=request.user.id).exists():
+        # Check if user is attending the session (cached; skips loading the session)
+        host_id = self.get_attending_session_host(pk)
+        if host_id is None:
             return Response(
                 {'detail': 'You must be attending this session to send messages'},
                 status=status.HTTP_403_FORBIDDEN
@@ -156,33 +373,35 @@ class StudySessionViewSet(viewsets.ModelViewSet):
         
         serializer = SessionMessageSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(sender=request.user, session=session)
+            message = serializer.save(sender=request.user, session_id=int(pk))
+            # Broadcast without the request so is_current_user is not baked in for everyone
+            publish_session_event(message.session_id, 'message.created', SessionMessageSerializer(message).data)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def resources(self, request, pk=None):
         """Get all resources for a session"""
-        session = self.get_object()
-        
-        # Check if user is attending the session
-        if not session.attendees.filter(id=request.user.id).exists():
+        # Check if user is attending the session (cached; skips loading the session)
+        host_id = self.get_attending_session_host(pk)
+        if host_id is None:
             return Response(
                 {'detail': 'You must be attending this session to view resources'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        resources = SessionResource.objects.filter(session=session).select_related('added_by')
-        serializer = SessionResourceSerializer(resources, many=True, context={'request': request})
+        resources = SessionResource.objects.filter(session_id=pk).select_related('added_by')
+        serializer = SessionResourceSerializer(
+            resources, many=True, context={'request': request, 'session_host_id': host_id}
+        )
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def add_resource(self, request, pk=None):
         """Add a resource to the session"""
-        session = self.get_object()
-        
-        # Check if user is attending the session
-        if not session.attendees.filter(id=request.user.id).exists():
+        # Check if user is attending the session (cached; skips loading the session)
+        host_id = self.get_attending_session_host(pk)
+        if host_id is None:
             return Response(
                 {'detail': 'You must be attending this session to add resources'},
                 status=status.HTTP_403_FORBIDDEN
@@ -190,7 +409,11 @@ class StudySessionViewSet(viewsets.ModelViewSet):
         
         serializer = SessionResourceSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(added_by=request.user, session=session)
+            resource = serializer.save(added_by=request.user, session_id=int(pk))
+            publish_session_event(
+                resource.session_id, 'resource.created',
+                SessionResourceSerializer(resource, context={'session_host_id': host_id}).data
+            )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -214,7 +437,9 @@ class StudySessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        resource_id = resource.id
         resource.delete()
+        publish_session_event(session.id, 'resource.deleted', {'id': resource_id})
         return Response(
             {'detail': 'Resource deleted successfully'},
             status=status.HTTP_200_OK
@@ -224,12 +449,16 @@ class StudySessionViewSet(viewsets.ModelViewSet):
 class StudyGroupViewSet(viewsets.ModelViewSet):
     """ViewSet for StudyGroup CRUD and membership"""
     permission_classes = [IsAuthenticatedOrReadOnly, IsCreatorOrReadOnly]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         # Only show approved groups to non-staff users
-        if self.request.user.is_staff:
-            return StudyGroup.objects.all().select_related('creator').prefetch_related('members')
-        return StudyGroup.objects.filter(status='approved').select_related('creator').prefetch_related('members')
+        queryset = StudyGroup.objects.select_related('creator')
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(status='approved')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.with_member_summary()
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -237,11 +466,24 @@ class StudyGroupViewSet(viewsets.ModelViewSet):
         return StudyGroupSerializer
     
     def perform_create(self, serializer):
-        group = serializer.save(creator=self.request.user, status='pending')
-        # Automatically add creator as member
-        GroupMembership.objects.create(user=self.request.user, group=group)
-        # Award XP for creating a group
-        award_xp(self.request.user, XP_REWARDS['create_group'])
+        with transaction.atomic():
+            group = serializer.save(creator=self.request.user, status='pending')
+            # Automatically add creator as member
+            GroupMembership.objects.create(user=self.request.user, group=group)
+            # Award XP for creating a group
+            enqueue_xp_award(self.request.user, 'create_group')
+            enqueue_activity(self.request.user, ['groups_joined'])
+        invalidate_dashboards([self.request.user.id])
+    
+    def perform_destroy(self, instance):
+        # Members' dashboards count the group; attendees' show its sessions' group name
+        affected_ids = set(GroupMembership.objects.filter(group=instance).values_list('user_id', flat=True))
+        affected_ids.update(SessionRSVP.objects.filter(session__group=instance).values_list('user_id', flat=True))
+        with transaction.atomic():
+            # Members' memberships are deleted with the group and its sessions leave it
+            enqueue_counter_changes(counter_changes(group_counters(instance), {}))
+            instance.delete()
+        invalidate_dashboards(affected_ids)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def join(self, request, pk=None):
@@ -262,11 +504,12 @@ class StudyGroupViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create membership
-        GroupMembership.objects.create(user=request.user, group=group)
-        
-        # Award XP for joining a group
-        award_xp(request.user, XP_REWARDS['join_group'])
+        # Create membership and award XP for joining a group
+        with transaction.atomic():
+            GroupMembership.objects.create(user=request.user, group=group)
+            enqueue_xp_award(request.user, 'join_group')
+            enqueue_activity(request.user, ['groups_joined'])
+        invalidate_dashboards([request.user.id])
         
         return Response(
             {'detail': 'Successfully joined group', 'xp_earned': XP_REWARDS['join_group']},
@@ -280,7 +523,10 @@ class StudyGroupViewSet(viewsets.ModelViewSet):
         
         try:
             membership = GroupMembership.objects.get(user=request.user, group=group)
-            membership.delete()
+            with transaction.atomic():
+                membership.delete()
+                enqueue_activity(request.user, ['groups_joined'], amount=-1)
+            invalidate_dashboards([request.user.id])
             return Response({'detail': 'Successfully left group'}, status=status.HTTP_200_OK)
         except GroupMembership.DoesNotExist:
             return Response(
@@ -288,11 +534,20 @@ class StudyGroupViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    @action(detail=True, methods=['get'], pagination_class=MemberCursorPagination)
+    def members(self, request, pk=None):
+        """Get the full, paginated member list for a group"""
+        group = self.get_object()
+        memberships = GroupMembership.objects.filter(group=group).select_related('user')
+        page = self.paginate_queryset(memberships)
+        data = [member_summary(membership.user) for membership in page]
+        return self.get_paginated_response(data)
+    
     @action(detail=True, methods=['get'])
     def sessions(self, request, pk=None):
         """Get all sessions for this group"""
         group = self.get_object()
-        sessions = StudySession.objects.filter(group=group).select_related('host').prefetch_related('attendees')
+        sessions = StudySession.objects.filter(group=group).select_related('host', 'group').with_attendee_summary()
         serializer = StudySessionSerializer(sessions, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -301,26 +556,65 @@ class LeaderboardViewSet(viewsets.ViewSet):
     """ViewSet for leaderboard rankings"""
     
     def list(self, request):
-        """Get leaderboard data"""
+        """Get leaderboard data for the current day, week or month, or all time"""
         period = request.query_params.get('period', 'week')
         
-        if period == 'week':
-            # Get users who earned XP in the last week
-            week_ago = timezone.now() - timedelta(days=7)
-            # For simplicity, just show top users by XP 
-            users = User.objects.all().order_by('-xp')[:10]
+        if period in XP_ROLLUP_PERIODS:
+            # Top XP earned this calendar period, read straight from the rollup index
+            period_start = xp_period_starts(timezone.localdate())[period]
+            rollups = list(XPRollup.objects.filter(
+                period=period, period_start=period_start
+            ).order_by('-xp', 'user_id').values_list('user_id', 'xp')[:10])
+            users = User.objects.with_latest_badge().in_bulk([user_id for user_id, _ in rollups])
+            data = LeaderboardSerializer([users[user_id] for user_id, _ in rollups], many=True).data
+            for user_data, (_, period_xp) in zip(data, rollups):
+                user_data['period_xp'] = period_xp
         else:
             # All-time leaderboard
-            users = User.objects.all().order_by('-xp')[:10]
-        
-        serializer = LeaderboardSerializer(users, many=True)
+            users = User.objects.with_latest_badge().order_by('-xp', 'id')[:10]
+            data = LeaderboardSerializer(users, many=True).data
         
         # Add rank to each user
-        data = serializer.data
         for idx, user_data in enumerate(data, 1):
             user_data['rank'] = idx
         
         return Response(data)
+    
+    @action(detail=False, methods=['get'])
+    def ranks(self, request):
+        """All-time ranks, paged with ?limit=&offset= or centred on a user with ?around=<user id>"""
+        ranking = get_rank_index()
+        paginator = RankPagination()
+        around = request.query_params.get('around')
+        if around is not None:
+            if not around.isdigit():
+                raise ValidationError({'around': 'Must be an integer id'})
+            user = User.objects.filter(pk=around).only('id', 'xp').first()
+            if user is None:
+                raise Http404
+            ids = paginator.paginate_around(ranking.ids, ranking.position(user.id, user.xp), request)
+        else:
+            ids = paginator.paginate_queryset(ranking.ids, request)
+        
+        users = User.objects.with_latest_badge().in_bulk(ids)
+        # Users deleted since the snapshot are skipped; everyone keeps their snapshot rank
+        ranked = [(rank, users[user_id]) for rank, user_id in enumerate(ids, paginator.offset + 1) if user_id in users]
+        data = LeaderboardSerializer([user for _, user in ranked], many=True).data
+        for (rank, _), user_data in zip(ranked, data):
+            user_data['rank'] = rank
+        return paginator.get_paginated_response(data)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def me(self, request):
+        """The current user's all-time rank, from their live XP against the cached ranking"""
+        ranking = get_rank_index()
+        # request.user may be a cached copy that predates the latest XP award
+        user = User.objects.with_latest_badge().get(pk=request.user.pk)
+        data = LeaderboardSerializer(user).data
+        data['rank'] = ranking.rank(user.id, user.xp)
+        # Users who joined since the snapshot are not counted yet
+        data['total_users'] = max(len(ranking), data['rank'])
+        return Response(data)
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -329,64 +623,94 @@ class DashboardViewSet(viewsets.ViewSet):
     
     def list(self, request):
         """Get dashboard data for current user"""
-        user = request.user
-        
-        # Get upcoming sessions user is attending
-        upcoming_sessions = StudySession.objects.filter(
-            attendees=user
-        ).select_related('host', 'group')[:3]
-        
-        sessions_serializer = StudySessionSerializer(
-            upcoming_sessions, 
-            many=True, 
-            context={'request': request}
-        )
-        
-        # Get user stats
-        stats = {
-            'sessions_attended': SessionRSVP.objects.filter(user=user).count(),
-            'groups_joined': GroupMembership.objects.filter(user=user).count(),
-            'sessions_hosted': StudySession.objects.filter(host=user).count(),
-            'xp': user.xp,
-            'level': user.level,
-        }
-        
-        return Response({
-            'upcoming_sessions': sessions_serializer.data,
-            'stats': stats,
-        })
+        return Response(get_dashboard(request.user))
 
 
 class AdminViewSet(viewsets.ViewSet):
     """ViewSet for admin operations"""
     permission_classes = [IsAdminUser]
     
+    pagination_class = CreatedAtCursorPagination
+    
     def list(self, request):
-        """Get all group requests"""
-        groups = StudyGroup.objects.all().select_related('creator').annotate(
-            members_count=Count('members')
+        """Moderation overview: stats plus the first page of each status queue.
+        
+        With ?status=pending|approved|rejected, returns further pages of that queue alone.
+        """
+        group_status = request.query_params.get('status')
+        if group_status is not None:
+            if group_status not in MODERATION_STATUSES:
+                raise ValidationError({'status': f"Must be one of: {', '.join(MODERATION_STATUSES)}"})
+            return Response(self.get_queue(request, group_status))
+        
+        data = {group_status: self.get_queue(request, group_status) for group_status in MODERATION_STATUSES}
+        data['stats'] = self.get_stats()
+        return Response(data)
+    
+    def get_queue(self, request, group_status):
+        """One cursor page of groups with the given status, newest first"""
+        paginator = self.pagination_class()
+        groups = StudyGroup.objects.filter(status=group_status).select_related('creator')
+        page = paginator.paginate_queryset(groups, request, view=self)
+        data = paginator.get_paginated_response(AdminGroupSerializer(page, many=True).data).data
+        # Page links must keep selecting this queue when followed from the overview
+        for link in ('next', 'previous'):
+            if data[link]:
+                data[link] = replace_query_param(data[link], 'status', group_status)
+        return data
+    
+    def get_stats(self):
+        """Moderation counters from one conditional aggregate per table"""
+        stats = StudyGroup.objects.aggregate(
+            total_groups=Count('id'),
+            pending_groups=Count('id', filter=Q(status='pending')),
+            approved_groups=Count('id', filter=Q(status='approved')),
+            rejected_groups=Count('id', filter=Q(status='rejected')),
         )
-        
-        pending = groups.filter(status='pending')
-        approved = groups.filter(status='approved')
-        rejected = groups.filter(status='rejected')
-        
-        data = {
-            'pending': StudyGroupSerializer(pending, many=True).data,
-            'approved': StudyGroupSerializer(approved, many=True).data,
-            'rejected': StudyGroupSerializer(rejected, many=True).data,
-            'stats': {
-                'total_groups': groups.count(),
-                'approved_groups': approved.count(),
-                'rejected_groups': rejected.count(),
-                'total_sessions': StudySession.objects.count(),
-                'active_sessions': StudySession.objects.filter(
-                    attendees__isnull=False
-                ).distinct().count(),
-            }
+        # Sessions with at least one RSVP; EXISTS avoids the DISTINCT join over attendees
+        stats.update(StudySession.objects.aggregate(
+            total_sessions=Count('id'),
+            active_sessions=Count('id', filter=Q(Exists(SessionRSVP.objects.filter(session=OuterRef('pk'))))),
+        ))
+        return stats
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Approve or reject many pending groups in one UPDATE.
+        
+        Returns a result per id: 'updated', 'unchanged' (already in the target
+        status, e.g. when a request is retried), 'skipped' (moderated the other
+        way meanwhile) or 'not_found'.
+        """
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        target_status = serializer.validated_data['status']
+        
+        # update() bypasses auto_now, and the shared timestamp identifies the rows this request changed
+        now = timezone.now()
+        updated = StudyGroup.objects.filter(id__in=ids, status='pending').update(status=target_status, updated_at=now)
+        
+        current = {
+            group_id: (group_status, updated_at)
+            for group_id, group_status, updated_at in StudyGroup.objects.filter(id__in=ids).values_list(
+                'id', 'status', 'updated_at'
+            )
         }
-        
-        return Response(data)
+        results = []
+        for group_id in ids:
+            group_status, updated_at = current.get(group_id, (None, None))
+            if group_status is None:
+                result = 'not_found'
+            elif group_status != target_status:
+                result = 'skipped'
+            elif updated_at == now:
+                result = 'updated'
+            else:
+                result = 'unchanged'
+            results.append({'id': group_id, 'result': result, 'status': group_status})
+        
+        return Response({'updated': updated, 'results': results}, status=status.HTTP_200_OK)
     
     @action(detail=True, methods=['patch'])
     def approve(self, request, pk=None):
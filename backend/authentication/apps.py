@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from .authentication import evict_saved_user
+        user_model = get_user_model()
+        post_save.connect(evict_saved_user, sender=user_model)
+        post_delete.connect(evict_saved_user, sender=user_model)
@@ -0,0 +1,103 @@
+"""JWT authentication that resolves users from a small in-process cache
+
+Every API call, including each chat poll, used to load the user row by
+primary key. CachedJWTAuthentication keeps recently seen users in a bounded
+LRU cache for USER_CACHE_TTL seconds instead. Saving or deleting a user, and
+award_xp_many's bulk XP updates, evict the cached entry once the transaction
+commits; other processes (such as the task worker awarding XP) cannot reach
+this cache, so their changes show up after at most USER_CACHE_TTL seconds.
+Endpoints that display a user's live XP should re-read the row rather than
+trust request.user.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+
+class UserCache:
+    """Thread-safe LRU cache of user instances whose entries expire after `ttl` seconds.
+
+    Keys are user ids as strings, since token claims may carry them as either.
+    """
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def invalidate_cached_users(user_ids):
+    """Evict users from this process's cache once the current transaction commits"""
+    user_ids = [str(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: user_cache.evict(user_ids))
+
+
+def evict_saved_user(sender, instance, **kwargs):
+    """post_save/post_delete handler for the user model"""
+    invalidate_cached_users([instance.pk])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that loads each user at most once per USER_CACHE_TTL"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = user_cache.get(str(user_id))
+        if user is None:
+            # Queries the row and runs simplejwt's is_active/revocation checks
+            user = super().get_user(validated_token)
+            user_cache.set(str(user_id), user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        # Requests may modify request.user, so never hand out the shared instance
+        return copy.copy(user)
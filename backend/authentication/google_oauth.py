@@ -1,5 +1,3 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -7,6 +5,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
 from api.models import User
+from .google_tokens import verify_google_id_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,20 +29,9 @@ class GoogleOAuthLoginView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Verify the token with Google
+            # Verify the token (signature, expiry, audience, issuer) against cached Google certs
             try:
-                idinfo = id_token.verify_oauth2_token(
-                    google_token,
-                    requests.Request(),
-                    settings.GOOGLE_CLIENT_ID
-                )
-
-                # Verify the issuer
-                if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-                    return Response(
-                        {'error': 'Invalid token issuer'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+                idinfo = verify_google_id_token(google_token, settings.GOOGLE_CLIENT_ID)
 
                 # Get user info from Google token
                 email = idinfo.get('email')
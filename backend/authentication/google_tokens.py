@@ -0,0 +1,139 @@
+"""Offline verification of Google ID tokens against cached signing certificates
+
+google.oauth2.id_token.verify_oauth2_token downloads Google's certificates on
+every call. GoogleCertCache keeps them in process and in the shared Django
+cache for as long as the certificate response's Cache-Control max-age allows,
+fetching through one pooled HTTP session, so steady-state logins verify the
+token signature locally. A token signed with a key id the cache does not know
+(Google rotated its keys) triggers one early refetch, at most every
+CERT_REFETCH_INTERVAL seconds.
+
+The certificate endpoint is settings.GOOGLE_CERTS_URL, which can point at a
+local fake endpoint in tests.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from http import HTTPStatus
+
+import requests as http
+from django.conf import settings
+from django.core.cache import cache
+from google.auth import exceptions, jwt
+from google.auth.transport import requests as google_requests
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+CERTS_CACHE_KEY = 'google-oauth-certs'
+
+# Used when the certificate response carries no usable max-age
+DEFAULT_CERTS_TTL = 3600
+
+# Minimum seconds between refetches triggered by an unknown key id
+CERT_REFETCH_INTERVAL = 60
+
+CERTS_FETCH_TIMEOUT = 5
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def certs_ttl(headers):
+    """Seconds the certificates may be cached, from Cache-Control max-age minus Age"""
+    match = _MAX_AGE_RE.search(headers.get('Cache-Control', ''))
+    if not match:
+        return DEFAULT_CERTS_TTL
+    try:
+        age = int(headers.get('Age', 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleCertCache:
+    """Google's {key id: PEM certificate} map, cached until the response's max-age runs out"""
+
+    def __init__(self, certs_url=None):
+        self.certs_url = certs_url
+        self.certs = None
+        self.expires_at = 0
+        self.fetched_at = 0
+        self._lock = threading.Lock()
+        self._session = http.Session()
+        self._request = google_requests.Request(session=self._session)
+
+    def get_certs(self, kid=None):
+        """Return cached certificates, fetching them if expired or missing `kid`"""
+        certs = self._usable_certs(kid)
+        if certs is not None:
+            return certs
+        with self._lock:
+            # Another thread or process may have refreshed them meanwhile
+            certs = self._usable_certs(kid)
+            if certs is None and self._load_shared():
+                certs = self._usable_certs(kid)
+            if certs is not None:
+                return certs
+            if self._usable_certs() is not None and time.time() - self.fetched_at < CERT_REFETCH_INTERVAL:
+                # Unknown key id right after a fetch: asking again will not help
+                return self.certs
+            return self._refresh()
+
+    def _usable_certs(self, kid=None):
+        certs = self.certs
+        if certs is None or time.time() >= self.expires_at:
+            return None
+        if kid is not None and kid not in certs:
+            return None
+        return certs
+
+    def _load_shared(self):
+        entry = cache.get(CERTS_CACHE_KEY)
+        if entry is None:
+            return False
+        self.certs, self.expires_at = entry['certs'], entry['expires_at']
+        return True
+
+    def _refresh(self):
+        url = self.certs_url or settings.GOOGLE_CERTS_URL
+        try:
+            response = self._request(url, method='GET', timeout=CERTS_FETCH_TIMEOUT)
+            if response.status != HTTPStatus.OK:
+                raise exceptions.TransportError(f'Could not fetch certificates at {url}: HTTP {response.status}')
+            certs = json.loads(response.data.decode('utf-8'))
+        except (exceptions.TransportError, ValueError):
+            if self.certs is None:
+                raise
+            # Keys outlive their max-age; keep verifying with the old ones and retry later
+            logger.warning('Could not refresh Google certificates from %s, using cached ones', url, exc_info=True)
+            self.fetched_at = time.time()
+            self.expires_at = max(self.expires_at, self.fetched_at + CERT_REFETCH_INTERVAL)
+            return self.certs
+
+        ttl = certs_ttl(response.headers)
+        self.certs = certs
+        self.fetched_at = time.time()
+        self.expires_at = self.fetched_at + ttl
+        if ttl:
+            cache.set(CERTS_CACHE_KEY, {'certs': certs, 'expires_at': self.expires_at}, ttl)
+        return certs
+
+
+google_certs = GoogleCertCache()
+
+
+def verify_google_id_token(token, audience, clock_skew_in_seconds=0):
+    """Verify a Google ID token's signature, expiry, audience and issuer.
+
+    Returns the token's claims. Raises ValueError if the token is invalid and
+    google.auth.exceptions.TransportError if certificates cannot be fetched.
+    """
+    kid = jwt.decode_header(token).get('kid')
+    certs = google_certs.get_certs(kid)
+    idinfo = jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_in_seconds)
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')!r}")
+    return idinfo
@@ -2,10 +2,11 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from api.models import User
-from api.serializers import UserProfileSerializer
+from api.serializers import UserProfileSerializer, prefetch_profile, PROFILE_INCLUDES
 from .serializers import RegisterSerializer, LoginSerializer
 
 
@@ -81,9 +82,29 @@ class LoginView(APIView):
 
 
 class CurrentUserView(generics.RetrieveUpdateAPIView):
-    """Get/update current user profile"""
+    """Get/update current user profile.
+
+    ?include=badges,groups picks the related data to return (default: all);
+    an empty ?include= returns the bare user.
+    """
     permission_classes = (IsAuthenticated,)
     serializer_class = UserProfileSerializer
 
+    def get_includes(self):
+        include = self.request.query_params.get('include')
+        if include is None:
+            return PROFILE_INCLUDES
+        names = {name.strip() for name in include.split(',') if name.strip()}
+        unknown = names.difference(PROFILE_INCLUDES)
+        if unknown:
+            raise ValidationError({'include': f"Unknown values: {', '.join(sorted(unknown))}"})
+        return names
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_includes()
+        return context
+
     def get_object(self):
-        return self.request.user
+        # request.user may be a cached copy; the profile shows live XP
+        return prefetch_profile(User.objects.get(pk=self.request.user.pk), self.get_includes())
@@ -28,6 +28,8 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-dev-key-change-in-pro
 # Google OAuth Settings
 GOOGLE_CLIENT_ID = config('GOOGLE_CLIENT_ID', default='')
 GOOGLE_CLIENT_SECRET = config('GOOGLE_CLIENT_SECRET', default='')
+# Where Google ID token signing certificates are fetched from (overridable for tests)
+GOOGLE_CERTS_URL = config('GOOGLE_CERTS_URL', default='https://www.googleapis.com/oauth2/v1/certs')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = config('DEBUG', default=True, cast=bool)
@@ -148,7 +150,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -191,6 +193,17 @@ CORS_ALLOWED_ORIGINS = config(
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Live session events (SSE). The in-process broker only reaches clients connected
+# to the same worker; with several ASGI workers use api.events.LocalProcessBroker
+# and run `python manage.py run_event_broker` alongside them.
+EVENT_BROKER = config('EVENT_BROKER', default='api.events.InProcessBroker')
+EVENT_BROKER_ADDRESS = config('EVENT_BROKER_ADDRESS', default='127.0.0.1:8765')
+
+# Side effects such as XP awards are queued in the database and run by
+# `python manage.py run_tasks`. Set TASK_QUEUE_EAGER=True to also run them in
+# the request process right after commit; failed ones are kept for run_tasks.
+TASK_QUEUE_EAGER = config('TASK_QUEUE_EAGER', default=False, cast=bool)
+
 CORS_ALLOW_HEADERS = [
     'accept',
     'accept-encoding', 
@@ -51,6 +51,20 @@ export default function AdminPage() {
     }
   }
 
+  const loadMore = async (queue: "pending" | "approved" | "rejected") => {
+    const next = adminData?.[queue]?.next
+    if (!next) return
+    try {
+      const page = await adminAPI.getQueuePage(next)
+      setAdminData((prev: any) => ({
+        ...prev,
+        [queue]: { ...page, results: [...prev[queue].results, ...page.results] },
+      }))
+    } catch (err) {
+      console.error("Failed to load more groups:", err)
+    }
+  }
+
   const handleApprove = async (id: string) => {
     try {
       await adminAPI.approveGroup(id)
@@ -71,6 +85,18 @@ export default function AdminPage() {
     }
   }
 
+  const handleBulk = async (status: "approved" | "rejected") => {
+    const ids = (adminData?.pending?.results || []).map((req: GroupRequest) => req.id)
+    if (ids.length === 0) return
+    try {
+      await adminAPI.bulkModerate(ids, status)
+      fetchAdminData() // Refresh data
+    } catch (err) {
+      console.error("Failed to moderate groups:", err)
+      alert("Failed to moderate groups")
+    }
+  }
+
   if (authLoading || loading) {
     return (
       <AppLayout>
@@ -91,11 +117,20 @@ export default function AdminPage() {
     )
   }
 
-  const pendingRequests = adminData.pending || []
-  const approvedRequests = adminData.approved || []
-  const rejectedRequests = adminData.rejected || []
+  const pendingRequests = adminData.pending?.results || []
+  const approvedRequests = adminData.approved?.results || []
+  const rejectedRequests = adminData.rejected?.results || []
   const stats = adminData.stats || {}
 
+  const LoadMore = ({ queue }: { queue: "pending" | "approved" | "rejected" }) =>
+    adminData[queue]?.next ? (
+      <div className="text-center">
+        <Button size="sm" variant="outline" className="bg-transparent" onClick={() => loadMore(queue)}>
+          Load more
+        </Button>
+      </div>
+    ) : null
+
   const RequestCard = ({ request, showActions }: { request: GroupRequest; showActions: boolean }) => (
     <Card className="glass-card p-6 mb-4">
       <div className="flex items-start justify-between gap-4">
@@ -195,9 +230,9 @@ export default function AdminPage() {
         {/* Tabs */}
         <Tabs defaultValue="pending" className="w-full">
           <TabsList className="grid w-full max-w-2xl grid-cols-3 mb-8">
-            <TabsTrigger value="pending">Pending ({pendingRequests.length})</TabsTrigger>
-            <TabsTrigger value="approved">Approved ({approvedRequests.length})</TabsTrigger>
-            <TabsTrigger value="rejected">Rejected ({rejectedRequests.length})</TabsTrigger>
+            <TabsTrigger value="pending">Pending ({stats.pending_groups || 0})</TabsTrigger>
+            <TabsTrigger value="approved">Approved ({stats.approved_groups || 0})</TabsTrigger>
+            <TabsTrigger value="rejected">Rejected ({stats.rejected_groups || 0})</TabsTrigger>
           </TabsList>
 
           {/* Pending Requests */}
@@ -208,9 +243,20 @@ export default function AdminPage() {
               </Card>
             ) : (
               <div>
+                <div className="flex justify-end gap-2 mb-4">
+                  <Button size="sm" variant="default" className="gap-1" onClick={() => handleBulk("approved")}>
+                    <CheckCircle size={16} />
+                    Approve all shown
+                  </Button>
+                  <Button size="sm" variant="outline" className="gap-1 bg-transparent" onClick={() => handleBulk("rejected")}>
+                    <XCircle size={16} />
+                    Reject all shown
+                  </Button>
+                </div>
                 {pendingRequests.map((req: GroupRequest) => (
                   <RequestCard key={req.id} request={req} showActions={true} />
                 ))}
+                <LoadMore queue="pending" />
               </div>
             )}
           </TabsContent>
@@ -226,6 +272,7 @@ export default function AdminPage() {
                 {approvedRequests.map((req: GroupRequest) => (
                   <RequestCard key={req.id} request={req} showActions={false} />
                 ))}
+                <LoadMore queue="approved" />
               </div>
             )}
           </TabsContent>
@@ -241,6 +288,7 @@ export default function AdminPage() {
                 {rejectedRequests.map((req: GroupRequest) => (
                   <RequestCard key={req.id} request={req} showActions={false} />
                 ))}
+                <LoadMore queue="rejected" />
               </div>
             )}
           </TabsContent>
@@ -19,15 +19,33 @@ export default function DiscoverPage() {
 
   const filters = ["All", "Online", "In-Person", "This Week", "Exam Prep"]
 
-  // Fetch sessions from API
+  // Search and filtering run on the server so only one ranked page is downloaded
+  const buildQuery = () => {
+    const terms = [searchTerm.trim()]
+    if (activeFilter === "Exam Prep") terms.push("cie")
+    const thisWeek = activeFilter === "This Week"
+    return {
+      q: terms.filter(Boolean).join(" ") || undefined,
+      mode: activeFilter === "Online" ? "online" as const : activeFilter === "In-Person" ? "in-person" as const : undefined,
+      starts_after: thisWeek ? new Date().toISOString() : undefined,
+      starts_before: thisWeek ? new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString() : undefined,
+      ordering: thisWeek ? "starts_at" as const : undefined,
+    }
+  }
+
+  const fetchSessions = async () => {
+    const data = await sessionsAPI.getAll(buildQuery())
+    // Handle both array and paginated response formats
+    const sessionsArray = Array.isArray(data) ? data : (data.results || [])
+    setSessions(sessionsArray)
+  }
+
+  // Fetch sessions from API, debounced while the user is typing
   useEffect(() => {
-    const fetchSessions = async () => {
+    const timeout = setTimeout(async () => {
       try {
         setLoading(true)
-        const data = await sessionsAPI.getAll()
-        // Handle both array and paginated response formats
-        const sessionsArray = Array.isArray(data) ? data : (data.results || [])
-        setSessions(sessionsArray)
+        await fetchSessions()
         setError(null)
       } catch (err: any) {
         console.error("Failed to fetch sessions:", err)
@@ -35,34 +53,14 @@ export default function DiscoverPage() {
       } finally {
         setLoading(false)
       }
-    }
+    }, 300)
 
-    fetchSessions()
-  }, [])
-
-  const filteredSessions = sessions.filter((session) => {
-    const matchesSearch =
-      session.course_code?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      session.title?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      session.group_name?.toLowerCase().includes(searchTerm.toLowerCase())
-
-    if (activeFilter === "All") return matchesSearch
-    if (activeFilter === "Online")
-      return matchesSearch && (session.location === "Discord Link" || session.location === "Online")
-    if (activeFilter === "In-Person")
-      return matchesSearch && session.location !== "Discord Link" && session.location !== "Online"
-    if (activeFilter === "This Week") return matchesSearch
-    if (activeFilter === "Exam Prep") return matchesSearch && session.title?.toLowerCase().includes("cie")
-
-    return matchesSearch
-  })
+    return () => clearTimeout(timeout)
+  }, [searchTerm, activeFilter])
 
   // Refresh sessions after creating a new one
   const handleSessionCreated = () => {
-    sessionsAPI.getAll().then(data => {
-      const sessionsArray = Array.isArray(data) ? data : (data.results || [])
-      setSessions(sessionsArray)
-    })
+    fetchSessions()
   }
 
   return (
@@ -122,7 +120,7 @@ export default function DiscoverPage() {
         {/* Sessions Grid */}
         {!loading && !error && (
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-5">
-            {filteredSessions.map((session) => (
+            {sessions.map((session) => (
               <StudySessionCard
                 key={session.id}
                 session={session}
@@ -132,7 +130,7 @@ export default function DiscoverPage() {
           </div>
         )}
 
-        {!loading && !error && filteredSessions.length === 0 && (
+        {!loading && !error && sessions.length === 0 && (
           <div className="text-center py-16">
             <p className="text-muted-foreground text-sm">No sessions found matching your search.</p>
           </div>
@@ -7,6 +7,7 @@ import { Card } from "@/components/ui/card"
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar"
 import AppLayout from "@/components/app-layout"
 import { leaderboardAPI } from "@/lib/api"
+import { useAuth } from "@/lib/auth-context"
 
 const badgeDefinitions = {
   Initiator: { color: "bg-yellow-500/20", textColor: "text-yellow-600" },
@@ -51,7 +52,7 @@ function LeaderboardRow({ item }: { item: any }) {
             </div>
           </div>
         </div>
-        <span className="font-bold text-lg text-primary">{item.xp?.toLocaleString()} XP</span>
+        <span className="font-bold text-lg text-primary">{(item.period_xp ?? item.xp)?.toLocaleString()} XP</span>
       </div>
     </Card>
   )
@@ -62,6 +63,15 @@ export default function LeaderboardPage() {
   const [leaderboard, setLeaderboard] = useState<any[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const [myRank, setMyRank] = useState<any>(null)
+  const { isAuthenticated } = useAuth()
+
+  useEffect(() => {
+    if (!isAuthenticated) return
+    leaderboardAPI.getMe()
+      .then(setMyRank)
+      .catch((err) => console.error("Failed to fetch rank:", err))
+  }, [isAuthenticated])
 
   useEffect(() => {
     const fetchLeaderboard = async () => {
@@ -90,6 +100,15 @@ export default function LeaderboardPage() {
       <div className="max-w-3xl">
         <h1 className="text-4xl font-bold mb-8">Student Leaderboard</h1>
 
+        {myRank && (
+          <Card className="glass-card p-4 mb-6 flex items-center justify-between">
+            <span className="text-sm text-muted-foreground">Your all-time rank</span>
+            <span className="font-bold text-lg">
+              #{myRank.rank} <span className="text-sm text-muted-foreground font-normal">of {myRank.total_users}</span>
+            </span>
+          </Card>
+        )}
+
         <Tabs value={period} onValueChange={handleTabChange} className="w-full">
           <TabsList className="grid w-full max-w-md grid-cols-2 mb-8">
             <TabsTrigger value="week">This Week</TabsTrigger>
@@ -344,9 +344,9 @@ export default function SessionDetailPage() {
                         <AvatarFallback>{attendee.name?.substring(0, 2).toUpperCase()}</AvatarFallback>
                       </Avatar>
                     ))}
-                    {session.attendees_list.length > 5 && (
+                    {session.attendees_count > 5 && (
                       <div className="h-10 w-10 rounded-full bg-secondary border-2 border-card flex items-center justify-center text-xs font-semibold">
-                        +{session.attendees_list.length - 5}
+                        +{session.attendees_count - 5}
                       </div>
                     )}
                   </div>
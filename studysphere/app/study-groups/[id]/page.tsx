@@ -141,7 +141,7 @@ export default function StudyGroupDetailPage() {
     )
   }
 
-  const isMember = group.members?.some((m: any) => m.id === user?.id)
+  const isMember = group.is_member
 
   return (
     <AppLayout>
@@ -321,15 +321,15 @@ export default function StudyGroupDetailPage() {
                 <p className="text-sm font-semibold mb-3">Members ({group.members_count || 0})</p>
                 {group.members && group.members.length > 0 ? (
                   <div className="flex -space-x-2 mb-3">
-                    {group.members.slice(0, 5).map((member: any, idx: number) => (
+                    {group.members.map((member: any, idx: number) => (
                       <Avatar key={idx} className="h-10 w-10 border-2 border-card">
                         <AvatarImage src={member.image || `https://api.dicebear.com/7.x/avataaars/svg?seed=${member.username}`} />
                         <AvatarFallback>{member.username?.substring(0, 2).toUpperCase()}</AvatarFallback>
                       </Avatar>
                     ))}
-                    {group.members.length > 5 && (
+                    {group.members_count > group.members.length && (
                       <div className="h-10 w-10 rounded-full bg-secondary border-2 border-card flex items-center justify-center text-xs font-semibold">
-                        +{group.members.length - 5}
+                        +{group.members_count - group.members.length}
                       </div>
                     )}
                   </div>
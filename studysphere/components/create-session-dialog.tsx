@@ -59,11 +59,10 @@ export default function CreateSessionDialog({ open, onOpenChange, onSessionCreat
 
         // Filter to only groups where the user is a member
         const userGroups = allGroups.filter((group: any) => {
-          const isMember = group.members?.some((member: any) => member.id === user?.id)
+          const isMember = group.is_member
           console.log(`Group "${group.name}":`, {
-            members: group.members,
-            isMember,
-            memberIds: group.members?.map((m: any) => m.id)
+            membersCount: group.members_count,
+            isMember
           })
           return isMember
         })
@@ -12,6 +12,7 @@ import { useAuth } from "@/lib/auth-context"
 
 interface Message {
     id: string
+    sender?: number
     text: string
     sender_name: string
     sender_image: string
@@ -25,20 +26,51 @@ interface SessionChatProps {
     attendeesCount: number
 }
 
+// Compact responses send each sender once; rebuild the per-message sender fields
+const expandMessages = (data: any, userId?: number): Message[] => {
+    const rows = Array.isArray(data) ? data : data.results || []
+    if (!data.senders) return rows
+    return rows.map((message: any) => ({
+        ...message,
+        sender_name: data.senders[message.sender]?.name,
+        sender_image: data.senders[message.sender]?.image,
+        is_current_user: message.sender === userId,
+    }))
+}
+
+// History pages (which carry a `next` link) are newest first; incremental fetches are oldest first
+const toChronological = (data: any, userId?: number): Message[] =>
+    "next" in data ? expandMessages(data, userId).reverse() : expandMessages(data, userId)
+
+// Append newly fetched messages, skipping any we already have (e.g. our own sends)
+const mergeMessages = (current: Message[], incoming: Message[]): Message[] => {
+    const known = new Set(current.map((message) => message.id))
+    const fresh = incoming.filter((message) => !known.has(message.id))
+    return fresh.length ? [...current, ...fresh] : current
+}
+
 export function SessionChat({ sessionId, sessionTitle, attendeesCount }: SessionChatProps) {
     const [messages, setMessages] = useState<Message[]>([])
     const [newMessage, setNewMessage] = useState("")
     const [loading, setLoading] = useState(true)
     const [sending, setSending] = useState(false)
+    const [olderPageUrl, setOlderPageUrl] = useState<string | null>(null)
+    const [loadingOlder, setLoadingOlder] = useState(false)
     const messagesEndRef = useRef<HTMLDivElement>(null)
+    const lastMessageIdRef = useRef<string | null>(null)
     const { user } = useAuth()
+    const userIdRef = useRef(user?.id)
+    userIdRef.current = user?.id
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" })
     }
 
+    // Only scroll when a newer message arrives, not when older history is prepended
     useEffect(() => {
-        scrollToBottom()
+        const lastId = messages.length ? messages[messages.length - 1].id : null
+        if (lastId !== lastMessageIdRef.current) scrollToBottom()
+        lastMessageIdRef.current = lastId
     }, [messages])
 
     // Fetch messages on mount
@@ -46,8 +78,9 @@ export function SessionChat({ sessionId, sessionTitle, attendeesCount }: Session
         const fetchMessages = async () => {
             try {
                 setLoading(true)
-                const data = await messagesAPI.getSessionMessages(sessionId)
-                setMessages(data)
+                const data = await messagesAPI.getSessionMessages(sessionId, { shape: "compact" })
+                setMessages(toChronological(data, userIdRef.current))
+                setOlderPageUrl(data.next || null)
             } catch (error) {
                 console.error("Failed to fetch messages:", error)
             } finally {
@@ -58,18 +91,76 @@ export function SessionChat({ sessionId, sessionTitle, attendeesCount }: Session
         fetchMessages()
     }, [sessionId])
 
-    // Poll for new messages every 3 seconds
+    const loadOlderMessages = async () => {
+        if (!olderPageUrl || loadingOlder) return
+        try {
+            setLoadingOlder(true)
+            const data = await messagesAPI.getPage(olderPageUrl)
+            setMessages((current) => [...toChronological(data, userIdRef.current), ...current])
+            setOlderPageUrl(data.next || null)
+        } catch (error) {
+            console.error("Failed to load older messages:", error)
+        } finally {
+            setLoadingOlder(false)
+        }
+    }
+
+    // Receive new messages from the session event stream, falling back to
+    // long-polling when streaming is unavailable (e.g. behind buffering proxies)
     useEffect(() => {
-        const interval = setInterval(async () => {
+        let stopped = false
+        let polling = false
+        let source: EventSource | null = null
+
+        // Fetch messages newer than the last one we have, optionally parking
+        // on the server for up to `wait` seconds until one arrives
+        const fetchNewer = async (wait?: number) => {
             try {
-                const data = await messagesAPI.getSessionMessages(sessionId)
-                setMessages(data)
+                const afterId = lastMessageIdRef.current
+                const data = afterId
+                    ? await messagesAPI.getSessionMessages(sessionId, { after_id: afterId, wait, shape: "compact" })
+                    : await messagesAPI.getSessionMessages(sessionId, { shape: "compact" })
+                if (!stopped) setMessages((current) => mergeMessages(current, toChronological(data, userIdRef.current)))
+                return true
             } catch (error) {
                 console.error("Failed to fetch messages:", error)
+                return false
             }
-        }, 3000)
+        }
+
+        const startPolling = async () => {
+            if (polling) return
+            polling = true
+            while (!stopped) {
+                const ok = await fetchNewer(25)
+                // Back off after errors, and while there is no message to poll after yet
+                if (!ok || !lastMessageIdRef.current) await new Promise((resolve) => setTimeout(resolve, 3000))
+            }
+        }
+
+        const token = localStorage.getItem("access_token")
+        if (typeof EventSource !== "undefined" && token) {
+            source = new EventSource(messagesAPI.getSessionEventsUrl(sessionId, token))
+            // Events are not replayed, so catch up on every (re)connect
+            source.onopen = () => fetchNewer()
+            source.addEventListener("resync", () => fetchNewer())
+            source.addEventListener("message.created", (event) => {
+                const message = JSON.parse((event as MessageEvent).data)
+                message.is_current_user = message.sender === userIdRef.current
+                setMessages((current) => mergeMessages(current, [message]))
+            })
+            source.onerror = () => {
+                // CLOSED means the server refused the stream (e.g. no ASGI server)
+                if (source?.readyState === EventSource.CLOSED) startPolling()
+            }
+        } else {
+            startPolling()
+        }
 
-        return () => clearInterval(interval)
+        return () => {
+            stopped = true
+            source?.close()
+        }
     }, [sessionId])
 
     const handleSendMessage = async () => {
@@ -78,7 +169,7 @@ export function SessionChat({ sessionId, sessionTitle, attendeesCount }: Session
         try {
             setSending(true)
             const sentMessage = await messagesAPI.sendSessionMessage(sessionId, newMessage)
-            setMessages([...messages, sentMessage])
+            setMessages((current) => mergeMessages(current, [sentMessage]))
             setNewMessage("")
         } catch (error: any) {
             console.error("Failed to send message:", error)
@@ -133,6 +224,13 @@ export function SessionChat({ sessionId, sessionTitle, attendeesCount }: Session
                     backgroundImage: `url("data:image/svg+xml,%3Csvg width='60' height='60' viewBox='0 0 60 60' xmlns='http://www.w3.org/2000/svg'%3E%3Cg fill='none' fillRule='evenodd'%3E%3Cg fill='%239C92AC' fillOpacity='0.05'%3E%3Cpath d='M36 34v-4h-2v4h-4v2h4v4h2v-4h4v-2h-4zm0-30V0h-2v4h-4v2h4v4h2V6h4V4h-4zM6 34v-4H4v4H0v2h4v4h2v-4h4v-2H6zM6 4V0H4v4H0v2h4v4h2V6h4V4H6z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E")`,
                 }}
             >
+                {olderPageUrl && (
+                    <div className="flex justify-center">
+                        <Button variant="ghost" size="sm" className="text-xs" onClick={loadOlderMessages} disabled={loadingOlder}>
+                            {loadingOlder ? "Loading..." : "Load earlier messages"}
+                        </Button>
+                    </div>
+                )}
                 {messages.length === 0 ? (
                     <div className="flex items-center justify-center h-full">
                         <p className="text-muted-foreground text-sm">No messages yet. Start the conversation!</p>
@@ -101,8 +101,10 @@ export const authAPI = {
         localStorage.removeItem('refresh_token');
     },
 
-    getCurrentUser: async () => {
-        const response = await apiClient.get('/auth/me/');
+    getCurrentUser: async (include?: string) => {
+        const response = await apiClient.get('/auth/me/', {
+            params: include === undefined ? undefined : { include },
+        });
         return response.data;
     },
 
@@ -128,8 +130,17 @@ export const authAPI = {
 
 
 export const sessionsAPI = {
-    getAll: async () => {
-        const response = await apiClient.get('/sessions/');
+    getAll: async (params?: {
+        q?: string;
+        mode?: 'online' | 'in-person';
+        course_code?: string;
+        group?: string;
+        starts_after?: string;
+        starts_before?: string;
+        upcoming?: boolean;
+        ordering?: 'starts_at';
+    }) => {
+        const response = await apiClient.get('/sessions/', { params });
         return response.data;
     },
 
@@ -170,6 +181,11 @@ export const sessionsAPI = {
         return response.data;
     },
 
+    getAttendees: async (id: string, cursor?: string) => {
+        const response = await apiClient.get(`/sessions/${id}/attendees/`, { params: { cursor } });
+        return response.data;
+    },
+
     getResources: async (id: string) => {
         const response = await apiClient.get(`/sessions/${id}/resources/`);
         return response.data;
@@ -226,6 +242,11 @@ export const groupsAPI = {
         return response.data;
     },
 
+    getMembers: async (id: string, cursor?: string) => {
+        const response = await apiClient.get(`/groups/${id}/members/`, { params: { cursor } });
+        return response.data;
+    },
+
     getSessions: async (id: string) => {
         const response = await apiClient.get(`/groups/${id}/sessions/`);
         return response.data;
@@ -248,10 +269,22 @@ export const dashboardAPI = {
 
 
 export const leaderboardAPI = {
-    get: async (period: 'week' | 'all' = 'week') => {
+    get: async (period: 'day' | 'week' | 'month' | 'all' = 'week') => {
         const response = await apiClient.get(`/leaderboard/?period=${period}`);
         return response.data;
     },
+
+    // Current user's all-time rank
+    getMe: async () => {
+        const response = await apiClient.get('/leaderboard/me/');
+        return response.data;
+    },
+
+    // All-time ranks by offset, or centred on a user with `around`
+    getRanks: async (params?: { limit?: number; offset?: number; around?: number }) => {
+        const response = await apiClient.get('/leaderboard/ranks/', { params });
+        return response.data;
+    },
 };
 
 // Admin API
@@ -263,6 +296,12 @@ export const adminAPI = {
         return response.data;
     },
 
+    // Follow a queue's `next` link from a previous response
+    getQueuePage: async (url: string) => {
+        const response = await apiClient.get(url);
+        return response.data;
+    },
+
     approveGroup: async (id: string) => {
         const response = await apiClient.patch(`/admin/groups/${id}/approve/`);
         return response.data;
@@ -272,17 +311,36 @@ export const adminAPI = {
         const response = await apiClient.patch(`/admin/groups/${id}/reject/`);
         return response.data;
     },
+
+    // Approve or reject up to 500 pending groups; safe to retry
+    bulkModerate: async (ids: string[], status: 'approved' | 'rejected') => {
+        const response = await apiClient.post('/admin/groups/bulk/', { ids, status });
+        return response.data;
+    },
 };
 
 
 // Messages API
 
 export const messagesAPI = {
-    getSessionMessages: async (sessionId: string) => {
-        const response = await apiClient.get(`/sessions/${sessionId}/messages/`);
+    getSessionMessages: async (
+        sessionId: string,
+        params?: { after_id?: string; since?: string; wait?: number; shape?: 'compact' }
+    ) => {
+        const response = await apiClient.get(`/sessions/${sessionId}/messages/`, { params });
+        return response.data;
+    },
+
+    // Follow a `next` link from a previous messages response
+    getPage: async (url: string) => {
+        const response = await apiClient.get(url);
         return response.data;
     },
 
+    // EventSource cannot send headers, so the access token goes in the query string
+    getSessionEventsUrl: (sessionId: string, token: string) =>
+        `${API_BASE_URL}/sessions/${sessionId}/events/?token=${encodeURIComponent(token)}`,
+
     sendSessionMessage: async (sessionId: string, text: string) => {
         const response = await apiClient.post(`/sessions/${sessionId}/send_message/`, { text });
         return response.data;
@@ -52,7 +52,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
             if (token) {
                 try {
-                    const userData = await authAPI.getCurrentUser();
+                    const userData = await authAPI.getCurrentUser('');
                     setUser(userData);
                 } catch (error) {
                     console.error('Failed to load user:', error);
@@ -113,7 +113,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
 
     const refreshUser = async () => {
         try {
-            const userData = await authAPI.getCurrentUser();
+            const userData = await authAPI.getCurrentUser('');
             setUser(userData);
         } catch (error) {
             console.error('Failed to refresh user:', error);